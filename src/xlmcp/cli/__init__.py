@@ -11,11 +11,80 @@ import time
 import warnings
 
 import click
+import yaml
 
 # - Suppress Pydantic warning from llama-index library
-warnings.filterwarnings("ignore", category=Warning, message=".*validate_default.*")
+# - UserWarning (what pydantic/llama-index actually emit) instead of the
+# - blanket Warning base class: unrelated warnings fail the cheap category
+# - check instead of running the message regex
+warnings.filterwarnings("ignore", category=UserWarning, message=".*validate_default.*")
 
-from xlmcp.utils import list_server_tools, print_tools_list
+
+def _scan_proc() -> int | None:
+    """
+    Find the xlmcp server PID by scanning /proc cmdlines (Linux).
+
+    Avoids the fork+exec of pgrep; each check is a directory listing
+    plus small reads.
+
+    Returns:
+        PID or None if not found
+    """
+    own_pid = os.getpid()
+    for entry in os.scandir('/proc'):
+        if not entry.name.isdigit() or int(entry.name) == own_pid:
+            continue
+        try:
+            with open(f'/proc/{entry.name}/cmdline', 'rb') as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if b'xlmcp.server' in cmdline:
+            return int(entry.name)
+    return None
+
+
+def _proc_info(pid: int) -> tuple[str, str] | None:
+    """
+    Read uptime and command for a PID from /proc without forking ps.
+
+    Returns:
+        (uptime string, command line) or None on failure
+    """
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            stat = f.read()
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            cmdline = f.read().replace(b'\0', b' ').decode(errors='replace').strip()
+        with open('/proc/stat') as f:
+            btime = next(int(line.split()[1]) for line in f if line.startswith('btime'))
+
+        # - Field 22 (starttime, in clock ticks) comes after the comm field,
+        # - which can contain spaces - split after the closing paren
+        fields = stat.rsplit(')', 1)[1].split()
+        starttime = int(fields[19])
+        uptime_s = int(time.time() - (btime + starttime / os.sysconf('SC_CLK_TCK')))
+
+        hours, rem = divmod(uptime_s, 3600)
+        uptime = f"{hours:02d}:{rem // 60:02d}:{rem % 60:02d}"
+        return uptime, cmdline
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+
+
+def _wait_for(condition, timeout: float = 2.0, interval: float = 0.02) -> bool:
+    """
+    Poll a condition until it holds or the deadline passes.
+
+    Replaces fixed sleeps: returns as soon as the condition is met
+    instead of always paying the worst-case wait.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return condition()
 
 
 def get_server_pid() -> int | None:
@@ -25,6 +94,13 @@ def get_server_pid() -> int | None:
     Returns:
         PID or None if not running
     """
+    # - Prefer the direct /proc scan on Linux; fall back to pgrep elsewhere
+    if os.path.isdir('/proc'):
+        try:
+            return _scan_proc()
+        except OSError:
+            pass
+
     try:
         result = subprocess.run(
             ["pgrep", "-f", "xlmcp.server"],
@@ -84,7 +160,9 @@ def start(foreground: bool):
             stderr=subprocess.DEVNULL,
             start_new_session=True
         )
-        time.sleep(1)  # Give it time to start
+        # - Poll instead of a fixed 1s sleep: confirms as soon as the
+        # - process appears, waits up to 2s on loaded machines
+        _wait_for(is_server_running)
 
         if is_server_running():
             click.echo("✓ xlmcp server started")
@@ -107,16 +185,14 @@ def stop():
 
     try:
         os.kill(pid, signal.SIGTERM)
-        time.sleep(0.5)
 
-        # - Check if stopped
-        if not is_server_running():
+        # - Check if stopped (poll so fast shutdowns return immediately)
+        if _wait_for(lambda: not is_server_running()):
             click.echo("✓ xlmcp server stopped")
         else:
             click.echo("✗ Server did not stop gracefully, forcing...")
             os.kill(pid, signal.SIGKILL)
-            time.sleep(0.5)
-            if not is_server_running():
+            if _wait_for(lambda: not is_server_running()):
                 click.echo("✓ xlmcp server killed")
             else:
                 click.echo("✗ Failed to stop server")
@@ -151,23 +227,30 @@ def status():
         click.echo("Status:  ✓ Running")
         click.echo(f"PID:     {pid}")
 
-        # - Get process info
-        try:
-            result = subprocess.run(
-                ["ps", "-p", str(pid), "-o", "etime=,cmd="],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                if len(lines) > 0:
-                    parts = lines[0].strip().split(None, 1)
-                    if len(parts) >= 1:
-                        click.echo(f"Uptime:  {parts[0]}")
-                    if len(parts) >= 2:
-                        click.echo(f"Command: {parts[1]}")
-        except Exception:
-            pass
+        # - Get process info straight from /proc (no subprocess)
+        info = _proc_info(pid) if os.path.isdir('/proc') else None
+        if info is not None:
+            uptime, command = info
+            click.echo(f"Uptime:  {uptime}")
+            click.echo(f"Command: {command}")
+        else:
+            # - Non-Linux fallback
+            try:
+                result = subprocess.run(
+                    ["ps", "-p", str(pid), "-o", "etime=,cmd="],
+                    capture_output=True,
+                    text=True
+                )
+                if result.returncode == 0:
+                    lines = result.stdout.strip().split('\n')
+                    if len(lines) > 0:
+                        parts = lines[0].strip().split(None, 1)
+                        if len(parts) >= 1:
+                            click.echo(f"Uptime:  {parts[0]}")
+                        if len(parts) >= 2:
+                            click.echo(f"Command: {parts[1]}")
+            except Exception:
+                pass
     else:
         click.echo("Status:  ✗ Not running")
 
@@ -178,6 +261,10 @@ def status():
 def list_command():
     """List all available MCP tools."""
     try:
+        # - Deferred: pulls in the server module (fastmcp, pymilvus, ...),
+        # - which commands like stop/status/start never need
+        from xlmcp.utils import list_server_tools, print_tools_list
+
         tools = list_server_tools()
         print_tools_list(tools)
     except Exception as e:
@@ -291,7 +378,6 @@ def reindex(name: str | None, reindex_all: bool, force: bool, jobs: int):
         sys.exit(1)
 
     try:
-        import yaml
         with open(knowledges_file) as f:
             data = yaml.safe_load(f)
 
@@ -332,8 +418,8 @@ def reindex(name: str | None, reindex_all: bool, force: bool, jobs: int):
         click.echo("  Make sure xlmcp is properly installed")
         sys.exit(1)
 
-    # - Helper function to reindex single knowledge base
-    def reindex_single(kb_name: str, info: dict) -> dict:
+    # - Helper coroutine to reindex single knowledge base
+    async def reindex_single(kb_name: str, info: dict) -> dict:
         """Reindex a single knowledge base (may have multiple paths) and return result."""
         if not isinstance(info, dict):
             return {"name": kb_name, "status": "error", "message": "Invalid configuration"}
@@ -371,12 +457,12 @@ def reindex(name: str | None, reindex_all: bool, force: bool, jobs: int):
                 continue
 
             try:
-                result = asyncio.run(indexer.index_directory(
+                result = await indexer.index_directory(
                     directory=str(path),
                     recursive=True,
                     force_reindex=force,
                     progress_callback=progress_callback
-                ))
+                )
 
                 # - Parse result
                 result_data = json.loads(result)
@@ -418,20 +504,28 @@ def reindex(name: str | None, reindex_all: bool, force: bool, jobs: int):
         click.echo(f"Parallel jobs: {jobs if jobs > 0 else 'all CPUs'}")
     click.echo(f"{'='*60}\n")
 
-    # - Run reindexing (parallel if multiple knowledge bases)
+    # - Run reindexing (concurrent if multiple knowledge bases). All KBs
+    # - share one process and one event loop, so the embedding-model
+    # - singleton and Milvus client LRU load once and get reused; joblib's
+    # - forked workers each re-imported pymilvus and reloaded the model
     if len(to_reindex) > 1:
-        # - Parallel execution
-        from joblib import Parallel, delayed
+        # - Concurrent execution, bounded by --jobs
+        async def _run_all() -> list[dict]:
+            sem = asyncio.Semaphore(jobs if jobs > 0 else (os.cpu_count() or 1))
 
-        results = Parallel(n_jobs=jobs, verbose=0)(
-            delayed(reindex_single)(kb_name, info) for kb_name, info in to_reindex
-        )
+            async def _one(kb_name: str, info: dict) -> dict:
+                async with sem:
+                    return await reindex_single(kb_name, info)
+
+            return await asyncio.gather(*(_one(kb_name, info) for kb_name, info in to_reindex))
+
+        results = asyncio.run(_run_all())
     else:
         # - Single execution - add header
         kb_name, info = to_reindex[0]
         click.echo(f"Knowledge base: {kb_name}")
         click.echo()
-        results = [reindex_single(kb_name, info) for kb_name, info in to_reindex]
+        results = [asyncio.run(reindex_single(kb_name, info))]
 
     # - Display results
     total_success = 0
@@ -3,23 +3,43 @@ Configuration for XLMCP server.
 """
 
 import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
-from pydantic import BaseModel
 
 # - Load environment variables
-# Priority: 1) Current directory .env, 2) ~/.aix/xlmcp/.env, 3) Environment variables
-_local_env = Path(".env")
-_global_env = Path.home() / ".aix" / "xlmcp" / ".env"
+# Priority: 1) Already-exported vars, 2) Current directory .env,
+# 3) ~/.aix/xlmcp/.env
+# - Keys whose presence means the parent shell/process already configured
+# - us, so the .env stat+parse can be skipped on the startup path
+_REQUIRED_ENV = ("JUPYTER_SERVER_URL", "JUPYTER_API_TOKEN")
 
-if _local_env.exists():
-    load_dotenv(_local_env)
-elif _global_env.exists():
-    load_dotenv(_global_env)
-else:
-    # - No .env file found, use environment variables only
-    load_dotenv(override=False)
+if not all(key in os.environ for key in _REQUIRED_ENV):
+    _local_env = Path(".env")
+    _global_env = Path.home() / ".aix" / "xlmcp" / ".env"
+
+    # - Explicit paths: avoids dotenv's upward directory walk
+    if _local_env.exists():
+        load_dotenv(_local_env)
+    elif _global_env.exists():
+        load_dotenv(_global_env)
+
+
+# - $HOME resolved once at import: expanduser re-reads the environment on
+# - every call, and validate_path sits on the tool-call hot path
+_HOME = os.path.expanduser("~")
+
+
+def _expand_user(path: str) -> str:
+    """Expand a leading ~ using the cached $HOME ("~user" still needs pwd)."""
+    if path == "~" or path.startswith("~/"):
+        return _HOME + path[1:]
+    if path.startswith("~"):
+        return os.path.expanduser(path)
+    return path
 
 
 def get_env_str(key: str, default: str) -> str:
@@ -49,23 +69,35 @@ def get_env_path(key: str, default: str) -> Path:
 
 def get_env_paths(key: str, default: str) -> list[Path]:
     """Get list of paths from environment."""
-    return [Path(p.strip()).expanduser() for p in os.getenv(key, default).split(",")]
+    parts = [p for p in map(str.strip, os.getenv(key, default).split(",")) if p]
+    return [Path(_expand_user(p)) for p in parts]
 
 
-class JupyterConfig(BaseModel):
-    """JupyterHub configuration."""
+def get_env_list(key: str, default: str) -> list[str]:
+    """Get comma-separated list of strings from environment."""
+    return [item.strip() for item in os.getenv(key, default).split(",") if item.strip()]
 
-    model_config = {"arbitrary_types_allowed": True}
+
+# - Plain frozen dataclasses: these are read-only data holders that are
+# - never (de)serialized, so pydantic's per-class schema build on import
+# - and per-field validation on construction bought nothing. slots also
+# - drops the per-instance __dict__ and speeds attribute reads.
+@dataclass(slots=True, frozen=True)
+class JupyterConfig:
+    """JupyterHub configuration."""
 
     server_url: str = get_env_str("JUPYTER_SERVER_URL", "http://localhost:8888")
     api_token: str = get_env_str("JUPYTER_API_TOKEN", "")
     notebook_dir: Path = get_env_path("JUPYTER_NOTEBOOK_DIR", "~/")
-    allowed_dirs: list[Path] = get_env_paths("JUPYTER_ALLOWED_DIRS", "~/")
+    # - Tuples: evaluated once at class creation like the scalar defaults,
+    # - no per-instance factory call, and immutable to match frozen=True
+    allowed_dirs: tuple[Path, ...] = tuple(get_env_paths("JUPYTER_ALLOWED_DIRS", "~/"))
     ws_timeout: float = get_env_float("JUPYTER_WS_TIMEOUT", 30.0)
     exec_timeout: float = get_env_float("JUPYTER_EXEC_TIMEOUT", 300.0)
 
 
-class MCPConfig(BaseModel):
+@dataclass(slots=True, frozen=True)
+class MCPConfig:
     """MCP server configuration."""
 
     name: str = "xlmcp-jupyter"
@@ -74,11 +106,10 @@ class MCPConfig(BaseModel):
     max_output_tokens: int = get_env_int("MCP_MAX_OUTPUT_TOKENS", 25000)
 
 
-class RAGConfig(BaseModel):
+@dataclass(slots=True, frozen=True)
+class RAGConfig:
     """RAG configuration."""
 
-    model_config = {"arbitrary_types_allowed": True}
-
     cache_dir: Path = get_env_path("RAG_CACHE_DIR", "~/.aix/knowledge")
     chunk_size: int = get_env_int("RAG_CHUNK_SIZE", 512)
     chunk_overlap: int = get_env_int("RAG_CHUNK_OVERLAP", 100)
@@ -87,38 +118,88 @@ class RAGConfig(BaseModel):
     default_search_limit: int = get_env_int("RAG_DEFAULT_SEARCH_LIMIT", 10)
     default_similarity_threshold: float = get_env_float("RAG_DEFAULT_SIMILARITY_THRESHOLD", 0.5)
     max_file_size_mb: int = get_env_int("RAG_MAX_FILE_SIZE_MB", 10)  # Skip files > 10MB
+    embedding_batch_size: int = get_env_int("RAG_EMBEDDING_BATCH_SIZE", 1000)  # Texts per embedding call
+    change_detection: str = get_env_str("RAG_CHANGE_DETECTION", "hash")  # "hash" or "mtime_size"
+    exclude_dirs: tuple[str, ...] = tuple(get_env_list("RAG_EXCLUDE_DIRS", ""))
     skip_notebook_outputs: bool = get_env_bool("RAG_SKIP_NOTEBOOK_OUTPUTS", False)
 
 
-class Config(BaseModel):
+@dataclass(slots=True, frozen=True)
+class Config:
     """Combined configuration."""
 
-    model_config = {"arbitrary_types_allowed": True}
-
+    # - Frozen sub-configs are safe to share, so build them once at class
+    # - creation instead of per Config() via default_factory
     jupyter: JupyterConfig = JupyterConfig()
     mcp: MCPConfig = MCPConfig()
     rag: RAGConfig = RAGConfig()
 
 
-# - Global config instance
-config = Config()
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """
+    Get the configuration singleton.
 
+    Built lazily on first call; every caller shares one instance. The
+    get_env_* helpers already coerce values to the declared types, so no
+    further validation happens at construction.
+    """
+    return Config()
 
-def get_config() -> Config:
-    """Get configuration instance."""
-    return config
 
+@lru_cache(maxsize=1)
+def _allowed_dir_prefixes() -> tuple[str, ...]:
+    """
+    Resolve allowed directories once, as separator-terminated strings.
 
-def validate_path(path: str | Path) -> Path:
-    """Validate that path is within allowed directories."""
-    path = Path(path).expanduser().resolve()
+    allowed_dirs never changes after startup, so re-running the
+    expanduser/resolve syscall chain per validate_path call is pure waste.
+    The trailing separator makes the prefix test exact (/home/a does not
+    match /home/ab). Sorted longest-first so the most specific prefix —
+    typically the working directory — is tested before catch-alls like ~/.
+    """
+    prefixes = {str(allowed.expanduser().resolve()) + os.sep for allowed in get_config().jupyter.allowed_dirs}
+    return tuple(sorted(prefixes, key=len, reverse=True))
+
+
+# - Negative cache: lru_cache does not store exceptions, so without this a
+# - client hammering a denied path re-runs resolve() and the prefix scan on
+# - every attempt. Bounded LRU of raw input -> resolved form of the denial.
+_denied: OrderedDict[str, str] = OrderedDict()
+_MAX_DENIED = 256
+
+
+@lru_cache(maxsize=512)
+def validate_path_str(raw_path: str) -> str:
+    """
+    Validate a raw path string and return its resolved form as a string.
+
+    Memoized: tool calls hit the same handful of notebook paths over and
+    over, and resolve() lstats every path component each time. Denials
+    are remembered in a separate bounded cache since lru_cache only
+    stores results. Callers that only need the string skip a Path
+    allocation by using this directly.
+    """
+    if raw_path in _denied:
+        _denied.move_to_end(raw_path)
+        raise PermissionError(f"Access denied: {_denied[raw_path]} is outside allowed directories")
 
-    for allowed in config.jupyter.allowed_dirs:
-        allowed = allowed.expanduser().resolve()
-        try:
-            path.relative_to(allowed)
-            return path
-        except ValueError:
-            continue
+    resolved = str(Path(_expand_user(raw_path)).resolve())
 
-    raise PermissionError(f"Access denied: {path} is outside allowed directories")
+    # - Plain startswith on resolved strings: no per-miss ValueError and no
+    # - parts-tuple splitting like relative_to does
+    candidate = resolved + os.sep
+    for allowed in _allowed_dir_prefixes():
+        if candidate.startswith(allowed):
+            return resolved
+
+    if len(_denied) >= _MAX_DENIED:
+        _denied.popitem(last=False)
+    _denied[raw_path] = resolved
+
+    raise PermissionError(f"Access denied: {resolved} is outside allowed directories")
+
+
+def validate_path(path: str | Path) -> Path:
+    """Validate that path is within allowed directories."""
+    return Path(validate_path_str(str(path)))
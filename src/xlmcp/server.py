@@ -2,20 +2,25 @@
 XLMCP Server - MCP Server for JupyterHub and Knowledge Integration
 """
 
-import asyncio
 import sys
 import warnings
 
 # - Suppress Pydantic warning from llama-index library
-warnings.filterwarnings("ignore", category=Warning, message=".*validate_default.*")
+# - UserWarning (what pydantic/llama-index actually emit) instead of the
+# - blanket Warning base class: unrelated warnings fail the cheap category
+# - check instead of running the message regex
+warnings.filterwarnings("ignore", category=UserWarning, message=".*validate_default.*")
 
 from fastmcp import FastMCP  # noqa: E402
 
 from xlmcp.config import get_config  # noqa: E402
 from xlmcp.tools.jupyter import kernel, notebook  # noqa: E402
-from xlmcp.tools.rag import indexer, registry, searcher, storage  # noqa: E402
 from xlmcp.tools.projects import manager as projects  # noqa: E402
 
+# - RAG submodules (indexer/registry/searcher/storage) pull in llama-index
+# - and the embedding stack, so they are imported inside each knowledge_*
+# - tool instead of here; sys.modules makes repeat imports a dict hit
+
 # - Create MCP server
 config = get_config()
 mcp = FastMCP(config.mcp.name)
@@ -51,6 +56,8 @@ def resolve_knowledge_directory(name_or_path: str) -> str:
         return str(Path(name_or_path).expanduser().resolve())
 
     # - Check if it's a knowledge base name in registry
+    from xlmcp.tools.rag import registry
+
     knowledges = registry.load_knowledges()
     if name_or_path in knowledges:
         paths = knowledges[name_or_path].get('paths', [])
@@ -62,298 +69,49 @@ def resolve_knowledge_directory(name_or_path: str) -> str:
 
 
 # =============================================================================
-# Notebook Tools
+# Notebook / Kernel / Execution Tools
 # =============================================================================
 
-
-@mcp.tool()
-async def jupyter_list_notebooks(directory: str = "") -> str:
-    """
-    List all Jupyter notebooks in a directory.
-
-    Args:
-        directory: Directory path relative to Jupyter root (empty for root)
-
-    Returns:
-        JSON with list of notebooks including name, path, and last_modified
-    """
-    return await notebook.list_notebooks(directory)
-
-
-@mcp.tool()
-async def jupyter_find_notebook(filename: str) -> str:
-    """
-    Find notebooks by filename.
-
-    Useful when you know the notebook name but not the full path.
-
-    Args:
-        filename: Notebook filename to search for (e.g., "analysis.ipynb")
-
-    Returns:
-        JSON with exact and partial matches including full paths
-    """
-    return await notebook.find_notebook_by_name(filename)
-
-
-@mcp.tool()
-async def jupyter_get_notebook_info(notebook_path: str) -> str:
-    """
-    Get information about a notebook including cell counts and kernel info.
-
-    Args:
-        notebook_path: Path to the notebook (relative to Jupyter root)
-
-    Returns:
-        JSON with notebook metadata, kernel info, and cell type summary
-    """
-    return await notebook.get_notebook_info(notebook_path)
-
-
-@mcp.tool()
-async def jupyter_read_cell(notebook_path: str, cell_index: int) -> str:
-    """
-    Read content of a specific cell in a notebook.
-
-    Args:
-        notebook_path: Path to the notebook
-        cell_index: Index of the cell (0-based)
-
-    Returns:
-        JSON with cell type, source, outputs (if code cell), and metadata
-    """
-    return await notebook.read_cell(notebook_path, cell_index)
-
-
-@mcp.tool()
-async def jupyter_read_all_cells(notebook_path: str) -> str:
-    """
-    Read all cells from a notebook.
-
-    Args:
-        notebook_path: Path to the notebook
-
-    Returns:
-        JSON with list of all cells (index, type, source, execution_count)
-    """
-    return await notebook.read_all_cells(notebook_path)
-
-
-@mcp.tool()
-async def jupyter_append_cell(
-    notebook_path: str,
-    source: str,
-    cell_type: str = "code",
-) -> str:
-    """
-    Append a new cell to the end of a notebook.
-
-    Args:
-        notebook_path: Path to the notebook
-        source: Cell content (code or markdown)
-        cell_type: Type of cell - 'code' or 'markdown' (default: code)
-
-    Returns:
-        JSON with success status and new cell index
-    """
-    return await notebook.append_cell(notebook_path, source, cell_type)
-
-
-@mcp.tool()
-async def jupyter_insert_cell(
-    notebook_path: str,
-    cell_index: int,
-    source: str,
-    cell_type: str = "code",
-) -> str:
-    """
-    Insert a new cell at a specific position in the notebook.
-
-    Args:
-        notebook_path: Path to the notebook
-        cell_index: Position to insert (0-based, cells after this shift down)
-        source: Cell content (code or markdown)
-        cell_type: Type of cell - 'code' or 'markdown' (default: code)
-
-    Returns:
-        JSON with success status
-    """
-    return await notebook.insert_cell(notebook_path, cell_index, source, cell_type)
-
-
-@mcp.tool()
-async def jupyter_update_cell(
-    notebook_path: str,
-    cell_index: int,
-    source: str,
-) -> str:
-    """
-    Update content of an existing cell.
-
-    Args:
-        notebook_path: Path to the notebook
-        cell_index: Index of the cell to update (0-based)
-        source: New cell content
-
-    Returns:
-        JSON with success status
-    """
-    return await notebook.update_cell(notebook_path, cell_index, source)
-
-
-@mcp.tool()
-async def jupyter_delete_cell(notebook_path: str, cell_index: int) -> str:
-    """
-    Delete a cell from the notebook.
-
-    Args:
-        notebook_path: Path to the notebook
-        cell_index: Index of the cell to delete (0-based)
-
-    Returns:
-        JSON with success status and deleted cell type
-    """
-    return await notebook.delete_cell(notebook_path, cell_index)
-
-
-# =============================================================================
-# Kernel Tools
-# =============================================================================
-
-
-@mcp.tool()
-async def jupyter_list_kernels() -> str:
-    """
-    List all running Jupyter kernels.
-
-    Returns:
-        JSON with list of kernels (id, name, state, connections)
-    """
-    return await kernel.list_kernels()
-
-
-@mcp.tool()
-async def jupyter_start_kernel(kernel_name: str = "python3") -> str:
-    """
-    Start a new Jupyter kernel.
-
-    Args:
-        kernel_name: Name of the kernel spec (default: python3)
-
-    Returns:
-        JSON with new kernel id, name, and state
-    """
-    return await kernel.start_kernel(kernel_name)
-
-
-@mcp.tool()
-async def jupyter_stop_kernel(kernel_id: str) -> str:
-    """
-    Stop a running kernel.
-
-    Args:
-        kernel_id: ID of the kernel to stop
-
-    Returns:
-        JSON with success status
-    """
-    return await kernel.stop_kernel(kernel_id)
-
-
-@mcp.tool()
-async def jupyter_restart_kernel(kernel_id: str) -> str:
-    """
-    Restart a kernel (clears all state).
-
-    Args:
-        kernel_id: ID of the kernel to restart
-
-    Returns:
-        JSON with new kernel state
-    """
-    return await kernel.restart_kernel(kernel_id)
-
-
-@mcp.tool()
-async def jupyter_interrupt_kernel(kernel_id: str) -> str:
-    """
-    Interrupt a running kernel (stop current execution).
-
-    Args:
-        kernel_id: ID of the kernel to interrupt
-
-    Returns:
-        JSON with success status
-    """
-    return await kernel.interrupt_kernel(kernel_id)
-
-
-# =============================================================================
-# Execution Tools
-# =============================================================================
-
-
-@mcp.tool()
-async def jupyter_execute_code(
-    kernel_id: str,
-    code: str,
-    timeout: float | None = None,
-) -> str:
-    """
-    Execute Python code in a running kernel.
-
-    Args:
-        kernel_id: ID of the kernel to execute in
-        code: Python code to execute
-        timeout: Execution timeout in seconds (default: 300)
-
-    Returns:
-        JSON with status ('ok' or 'error'), outputs, and error details if any
-    """
-    return await kernel.execute_code(kernel_id, code, timeout)
-
-
-@mcp.tool()
-async def jupyter_connect_notebook(notebook_path: str) -> str:
-    """
-    Connect to a notebook's kernel (create session if needed).
-
-    This gets an existing kernel session for the notebook or creates a new one.
-    Use the returned kernel_id for subsequent execute_code calls.
-
-    Args:
-        notebook_path: Path to the notebook
-
-    Returns:
-        JSON with session_id, kernel_id, and kernel state
-    """
-    return await kernel.get_or_create_kernel_for_notebook(notebook_path)
-
-
-@mcp.tool()
-async def jupyter_execute_cell(
-    notebook_path: str,
-    cell_index: int,
-    timeout: float | None = None,
-) -> str:
-    """
-    Execute a specific cell in a notebook.
-
-    This will:
-    1. Connect to the notebook's kernel (or create one)
-    2. Execute the cell's code
-    3. Save outputs to notebook file (visible in VS Code)
-    4. Return the execution outputs
-
-    Args:
-        notebook_path: Path to the notebook
-        cell_index: Index of the cell to execute (0-based)
-        timeout: Execution timeout in seconds (default: 300)
-
-    Returns:
-        JSON with cell_index, status, outputs, and error if any
-    """
-    return await kernel.execute_notebook_cell(notebook_path, cell_index, timeout)
+# - Pure passthrough tools: register the underlying coroutines directly so
+# - each call skips an extra wrapper frame and import skips creating ~25
+# - do-nothing function objects. Schemas and descriptions come from the
+# - target functions' own signatures and docstrings.
+_DIRECT_TOOLS = {
+    # - Notebook tools
+    "jupyter_list_notebooks": notebook.list_notebooks,
+    "jupyter_find_notebook": notebook.find_notebook_by_name,
+    "jupyter_get_notebook_info": notebook.get_notebook_info,
+    "jupyter_read_cell": notebook.read_cell,
+    "jupyter_read_all_cells": notebook.read_all_cells,
+    "jupyter_append_cell": notebook.append_cell,
+    "jupyter_insert_cell": notebook.insert_cell,
+    "jupyter_update_cell": notebook.update_cell,
+    "jupyter_delete_cell": notebook.delete_cell,
+    # - Kernel tools
+    "jupyter_list_kernels": kernel.list_kernels,
+    "jupyter_start_kernel": kernel.start_kernel,
+    "jupyter_stop_kernel": kernel.stop_kernel,
+    "jupyter_restart_kernel": kernel.restart_kernel,
+    "jupyter_interrupt_kernel": kernel.interrupt_kernel,
+    # - Execution tools
+    "jupyter_execute_code": kernel.execute_code,
+    "jupyter_connect_notebook": kernel.get_or_create_kernel_for_notebook,
+    "jupyter_execute_cell": kernel.execute_notebook_cell,
+    # - Project management tools
+    "project_create": projects.create_project,
+    "project_list": projects.list_projects,
+    "project_get": projects.get_project,
+    "project_update_description": projects.update_description,
+    "project_add_log": projects.add_log_entry,
+    "project_read_log": projects.read_log,
+    "project_set_context": projects.set_context,
+    "project_get_context": projects.get_context,
+}
+
+# - Intern the names so FastMCP's dispatch dict holds interned keys and
+# - repeated lookups can short-circuit on pointer identity
+for _tool_name, _tool_fn in _DIRECT_TOOLS.items():
+    mcp.tool(name=sys.intern(_tool_name))(_tool_fn)
 
 
 # =============================================================================
@@ -380,6 +138,8 @@ async def knowledge_index_directory(
     Returns:
         JSON with indexing results (processed files, chunks, status)
     """
+    from xlmcp.tools.rag import indexer
+
     # - Resolve KB name or path to directory
     resolved_dir = resolve_knowledge_directory(directory)
     return await indexer.index_directory(resolved_dir, recursive, force_reindex)
@@ -412,6 +172,8 @@ async def knowledge_search(
     """
     import json
 
+    from xlmcp.tools.rag import registry, searcher
+
     # - If no directory specified, search all registered knowledge bases
     if directory is None:
         knowledges = registry.load_knowledges()
@@ -457,6 +219,8 @@ async def knowledge_list_indexes() -> str:
     Returns:
         JSON with list of indexes (directory, collection, file_count, last_updated)
     """
+    from xlmcp.tools.rag import storage
+
     return await storage.list_all_indexes()
 
 
@@ -475,6 +239,8 @@ async def knowledge_refresh_index(
     Returns:
         JSON with refresh results
     """
+    from xlmcp.tools.rag import indexer
+
     # - Resolve KB name or path to directory (if provided)
     resolved_dir = resolve_knowledge_directory(directory) if directory else None
     return await indexer.refresh_index(resolved_dir, recursive)
@@ -493,6 +259,8 @@ async def knowledge_get_tags(directory: str | None = None) -> str:
     """
     import json
 
+    from xlmcp.tools.rag import registry, searcher
+
     # - If no directory specified, aggregate tags from all registered knowledge bases
     if directory is None:
         knowledges = registry.load_knowledges()
@@ -540,6 +308,8 @@ async def knowledge_get_metadata_fields(directory: str | None = None) -> str:
     """
     import json
 
+    from xlmcp.tools.rag import registry, searcher
+
     # - If no directory specified, aggregate metadata from all registered knowledge bases
     if directory is None:
         knowledges = registry.load_knowledges()
@@ -582,6 +352,8 @@ async def knowledge_drop_index(directory: str) -> str:
     Returns:
         JSON with status
     """
+    from xlmcp.tools.rag import storage
+
     # - Resolve KB name or path to directory
     resolved_dir = resolve_knowledge_directory(directory)
     return await storage.drop_index(resolved_dir)
@@ -599,151 +371,9 @@ async def knowledge_list_knowledges() -> str:
         JSON with knowledge bases information including paths, descriptions,
         tags, existence status, and index status
     """
-    return await registry.list_knowledges()
-
-
-# =============================================================================
-# Project Management Tools
-# =============================================================================
-
-
-@mcp.tool()
-async def project_create(
-    name: str, description: str = "", tags: list[str] | None = None, project_type: str | None = None
-) -> str:
-    """
-    Create a new project.
-
-    Projects are stored in ~/.aix/projects/ and contain:
-    - description.md: Project description and metadata
-    - log.md: Timestamped log entries
-    - context.json: Machine-readable project state
-
-    Args:
-        name: Project name (used as directory name)
-        description: Project description
-        tags: Optional tags for categorization
-        project_type: Optional project type (e.g., 'strategy', 'research', 'optimization')
-
-    Returns:
-        JSON with status and project information
-    """
-    return await projects.create_project(name, description, tags, project_type)
-
-
-@mcp.tool()
-async def project_list() -> str:
-    """
-    List all projects.
-
-    Returns:
-        JSON with list of all projects including name, status, type, tags, and timestamps
-    """
-    return await projects.list_projects()
-
-
-@mcp.tool()
-async def project_get(name: str) -> str:
-    """
-    Get detailed information about a project.
-
-    Args:
-        name: Project name
-
-    Returns:
-        JSON with project details including description, recent logs, and context
-    """
-    return await projects.get_project(name)
-
-
-@mcp.tool()
-async def project_update_description(name: str, description: str) -> str:
-    """
-    Update project description.
-
-    Args:
-        name: Project name
-        description: New description content
-
-    Returns:
-        JSON with status
-    """
-    return await projects.update_description(name, description)
-
-
-@mcp.tool()
-async def project_add_log(name: str, content: str, tags: list[str] | None = None) -> str:
-    """
-    Add a log entry to project.
-
-    Log entries are automatically timestamped and appended to the project's log.md file.
-
-    Args:
-        name: Project name
-        content: Log entry content (markdown supported)
-        tags: Optional tags for categorization (e.g., ['experiment', 'backtest', 'bug-fix'])
-
-    Returns:
-        JSON with status and entry timestamp
-    """
-    return await projects.add_log_entry(name, content, tags)
-
-
-@mcp.tool()
-async def project_read_log(name: str, limit: int = 10) -> str:
-    """
-    Read recent log entries from project.
-
-    Args:
-        name: Project name
-        limit: Maximum number of entries to return (default: 10)
-
-    Returns:
-        JSON with log entries (most recent first)
-    """
-    return await projects.read_log(name, limit)
-
-
-@mcp.tool()
-async def project_set_context(
-    name: str,
-    working_files: list[str] | None = None,
-    active_research: list[str] | None = None,
-    blockers: list[str] | None = None,
-    next_steps: list[str] | None = None,
-    knowledge_bases: list[str] | None = None,
-) -> str:
-    """
-    Set or update project context.
+    from xlmcp.tools.rag import registry
 
-    Context is machine-readable state stored in context.json. Only provided fields are updated.
-
-    Args:
-        name: Project name
-        working_files: Currently active files
-        active_research: Active research topics
-        blockers: Current blockers/issues
-        next_steps: Planned next steps
-        knowledge_bases: Related knowledge bases
-
-    Returns:
-        JSON with status
-    """
-    return await projects.set_context(name, working_files, active_research, blockers, next_steps, knowledge_bases)
-
-
-@mcp.tool()
-async def project_get_context(name: str) -> str:
-    """
-    Get project context.
-
-    Args:
-        name: Project name
-
-    Returns:
-        JSON with project context (working files, research topics, next steps, etc.)
-    """
-    return await projects.get_context(name)
+    return await registry.list_knowledges()
 
 
 # =============================================================================
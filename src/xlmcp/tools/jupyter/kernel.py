@@ -1,9 +1,23 @@
 """Kernel management and code execution tools for MCP."""
 
-import json
+import asyncio
+
+import orjson
 
 from xlmcp.tools.jupyter.client import get_client
 
+# - 64KB: above this the payload is machine-consumed bulk output where
+# - pretty-printing only adds bytes and encode time
+_INDENT_LIMIT = 65536
+
+
+def _dumps(payload) -> str:
+    """Serialize a tool response with orjson, indenting small payloads only."""
+    compact = orjson.dumps(payload)
+    if len(compact) > _INDENT_LIMIT:
+        return compact.decode()
+    return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
+
 
 async def list_kernels() -> str:
     """
@@ -24,7 +38,7 @@ async def list_kernels() -> str:
             "connections": k.get("connections", 0),
         })
 
-    return json.dumps({"kernels": result, "count": len(result)}, indent=2)
+    return _dumps({"kernels": result, "count": len(result)})
 
 
 async def start_kernel(kernel_name: str = "python3") -> str:
@@ -40,12 +54,12 @@ async def start_kernel(kernel_name: str = "python3") -> str:
     client = get_client()
     kernel = await client.start_kernel(kernel_name)
 
-    return json.dumps({
+    return _dumps({
         "success": True,
         "kernel_id": kernel.get("id"),
         "name": kernel.get("name"),
         "state": kernel.get("execution_state"),
-    }, indent=2)
+    })
 
 
 async def stop_kernel(kernel_id: str) -> str:
@@ -61,7 +75,7 @@ async def stop_kernel(kernel_id: str) -> str:
     client = get_client()
     success = await client.stop_kernel(kernel_id)
 
-    return json.dumps({
+    return _dumps({
         "success": success,
         "message": f"Kernel {kernel_id} stopped" if success else f"Failed to stop kernel {kernel_id}",
     })
@@ -80,12 +94,12 @@ async def restart_kernel(kernel_id: str) -> str:
     client = get_client()
     kernel = await client.restart_kernel(kernel_id)
 
-    return json.dumps({
+    return _dumps({
         "success": True,
         "kernel_id": kernel.get("id"),
         "state": kernel.get("execution_state"),
         "message": "Kernel restarted",
-    }, indent=2)
+    })
 
 
 async def interrupt_kernel(kernel_id: str) -> str:
@@ -101,7 +115,7 @@ async def interrupt_kernel(kernel_id: str) -> str:
     client = get_client()
     success = await client.interrupt_kernel(kernel_id)
 
-    return json.dumps({
+    return _dumps({
         "success": success,
         "message": f"Kernel {kernel_id} interrupted" if success else f"Failed to interrupt kernel {kernel_id}",
     })
@@ -126,27 +140,30 @@ async def execute_code(
     client = get_client()
     result = await client.execute_code(kernel_id, code, timeout)
 
-    # - Format outputs for display
+    # - Format outputs for display. Hot loop for cells that emit thousands
+    # - of stream chunks: look the type up once and hoist the append bound
+    # - method so each iteration is a single dict build
     formatted_outputs = []
-    for output in result.get("outputs", []):
-        if output["type"] == "stream":
-            formatted_outputs.append({
+    append = formatted_outputs.append
+    for output in result.get("outputs", ()):
+        output_type = output["type"]
+        if output_type == "stream":
+            append({
                 "type": "stream",
                 "name": output.get("name"),
                 "text": output.get("text"),
             })
-        elif output["type"] == "execute_result":
-            data = output.get("data", {})
+        elif output_type == "execute_result":
+            data = output.get("data") or {}
             # - Prefer text/plain for MCP output
-            text = data.get("text/plain", str(data))
-            formatted_outputs.append({
+            append({
                 "type": "result",
-                "text": text,
+                "text": data.get("text/plain", str(data)),
                 "execution_count": output.get("execution_count"),
             })
-        elif output["type"] == "display_data":
-            data = output.get("data", {})
-            formatted_outputs.append({
+        elif output_type == "display_data":
+            data = output.get("data") or {}
+            append({
                 "type": "display",
                 "text": data.get("text/plain", ""),
                 "has_image": "image/png" in data,
@@ -165,7 +182,7 @@ async def execute_code(
             "traceback": result["error"].get("traceback", []),
         }
 
-    return json.dumps(response, indent=2)
+    return _dumps(response)
 
 
 async def get_or_create_kernel_for_notebook(notebook_path: str) -> str:
@@ -180,21 +197,25 @@ async def get_or_create_kernel_for_notebook(notebook_path: str) -> str:
     """
     client = get_client()
 
-    # - Check for existing session
-    session = await client.get_session_for_notebook(notebook_path)
+    # - Fetch the session and notebook concurrently: both are independent
+    # - Jupyter round-trips, and the notebook metadata is needed right away
+    # - whenever no session exists yet
+    session, nb_data = await asyncio.gather(
+        client.get_session_for_notebook(notebook_path),
+        client.get_notebook(notebook_path),
+    )
 
     if session:
         kernel = session.get("kernel", {})
-        return json.dumps({
+        return _dumps({
             "status": "existing",
             "session_id": session.get("id"),
             "kernel_id": kernel.get("id"),
             "kernel_name": kernel.get("name"),
             "kernel_state": kernel.get("execution_state"),
-        }, indent=2)
+        })
 
     # - Get kernel name from notebook metadata
-    nb_data = await client.get_notebook(notebook_path)
     content = nb_data.get("content", {})
     kernel_name = content.get("metadata", {}).get("kernelspec", {}).get("name", "python3")
 
@@ -202,13 +223,13 @@ async def get_or_create_kernel_for_notebook(notebook_path: str) -> str:
     session = await client.create_session(notebook_path, kernel_name=kernel_name)
     kernel = session.get("kernel", {})
 
-    return json.dumps({
+    return _dumps({
         "status": "created",
         "session_id": session.get("id"),
         "kernel_id": kernel.get("id"),
         "kernel_name": kernel.get("name"),
         "kernel_state": kernel.get("execution_state"),
-    }, indent=2)
+    })
 
 
 async def execute_notebook_cell(
@@ -238,31 +259,34 @@ async def execute_notebook_cell(
     """
     client = get_client()
 
-    # - Get notebook content
-    nb_data = await client.get_notebook(notebook_path)
+    # - Get notebook content and any existing session in one overlapped
+    # - round-trip instead of two sequential ones
+    nb_data, session = await asyncio.gather(
+        client.get_notebook(notebook_path),
+        client.get_session_for_notebook(notebook_path),
+    )
     content = nb_data.get("content", {})
     cells = content.get("cells", [])
 
     if cell_index < 0 or cell_index >= len(cells):
-        return json.dumps({"error": f"Cell index {cell_index} out of range (0-{len(cells)-1})"})
+        return _dumps({"error": f"Cell index {cell_index} out of range (0-{len(cells)-1})"})
 
     cell = cells[cell_index]
 
     if cell.get("cell_type") != "code":
-        return json.dumps({
+        return _dumps({
             "status": "skipped",
             "message": f"Cell {cell_index} is a {cell.get('cell_type')} cell, not code",
         })
 
     # - Get or create kernel (using notebook's kernel metadata)
-    session = await client.get_session_for_notebook(notebook_path)
     if not session:
         kernel_name = content.get("metadata", {}).get("kernelspec", {}).get("name", "python3")
         session = await client.create_session(notebook_path, kernel_name=kernel_name)
 
     kernel_id = session.get("kernel", {}).get("id")
     if not kernel_id:
-        return json.dumps({"error": "Could not get kernel for notebook"})
+        return _dumps({"error": "Could not get kernel for notebook"})
 
     # - Execute the cell
     code = cell.get("source", "")
@@ -316,10 +340,10 @@ async def execute_notebook_cell(
         # - Save notebook
         await client.save_notebook(notebook_path, content)
 
-    return json.dumps({
+    return _dumps({
         "cell_index": cell_index,
         "status": result["status"],
         "outputs": result.get("outputs", []),
         "error": result.get("error"),
         "saved_to_notebook": save_outputs,
-    }, indent=2)
+    })
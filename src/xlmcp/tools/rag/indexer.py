@@ -5,88 +5,239 @@ Handles change detection, document processing, and auto-refresh.
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
 import os
 import time
 
 # - Suppress warnings from dependencies
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 # - Suppress transformers warning (we don't use transformer models)
 os.environ["TRANSFORMERS_NO_ADVISORY_WARNINGS"] = "1"
-warnings.filterwarnings("ignore", category=Warning, message=".*validate_default.*")
+# - UserWarning (what pydantic/llama-index actually emit) instead of the
+# - blanket Warning base class: unrelated warnings fail the cheap category
+# - check instead of running the message regex
+warnings.filterwarnings("ignore", category=UserWarning, message=".*validate_default.*")
 warnings.filterwarnings("ignore", category=Warning, message=".*pkg_resources.*")
 warnings.filterwarnings("ignore", message=".*PyTorch.*TensorFlow.*Flax.*")
 
-from llama_index.core import SimpleDirectoryReader  # noqa: E402
 from llama_index.core.node_parser import MarkdownNodeParser  # noqa: E402
 from llama_index.core.text_splitter import TokenTextSplitter  # noqa: E402
 
-from xlmcp.config import get_config, validate_path  # noqa: E402
+from xlmcp.config import get_config, validate_path_str  # noqa: E402
 from xlmcp.tools.rag import metadata as metadata_module  # noqa: E402
 from xlmcp.tools.rag import storage  # noqa: E402
 from xlmcp.tools.rag.models import FileType  # noqa: E402
 
 
+def _dumps(payload) -> str:
+    """Serialize a tool response as indented JSON via orjson."""
+    return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
+
+
+# - Directory names that never contain user knowledge; pruning them early
+# - dwarfs intra-file optimizations on real codebases (hidden dirs like .git
+# - and .venv are already skipped by the dot-prefix check)
+_IGNORE_DIRS = frozenset(
+    {"__pycache__", "node_modules", "site-packages", "venv", "dist", "build", "target"}
+)
+
+
+def _ignored_dirs() -> frozenset[str]:
+    """Directory names pruned during traversal (built-ins + config additions)."""
+    exclude = get_config().rag.exclude_dirs
+    return _IGNORE_DIRS.union(exclude) if exclude else _IGNORE_DIRS
+
+
+# - Tokenizer used by TokenTextSplitter (created lazily, reused across runs)
+_chunk_tokenizer = None
+_chunk_tokenizer_failed = False
+
+
+def _get_chunk_tokenizer():
+    """
+    Get tokenizer callable for TokenTextSplitter, or None for the default.
+
+    Prefers the Rust-backed HF `tokenizers` package when installed (the
+    "fast" optional dependency group) - its BPE encode is roughly an order
+    of magnitude faster than tiktoken's per-call Python glue, and chunking
+    is the compute bottleneck of indexing. Falls back to the splitter's
+    default tiktoken tokenizer when unavailable.
+    """
+    global _chunk_tokenizer, _chunk_tokenizer_failed
+
+    if _chunk_tokenizer is None and not _chunk_tokenizer_failed:
+        try:
+            from tokenizers import Tokenizer
+
+            hf_tokenizer = Tokenizer.from_pretrained(os.getenv("RAG_CHUNK_TOKENIZER", "gpt2"))
+            _chunk_tokenizer = lambda text: hf_tokenizer.encode(text, add_special_tokens=False).ids  # noqa: E731
+        except Exception:
+            # - Package missing or model fetch failed: use the default tokenizer
+            _chunk_tokenizer_failed = True
+
+    return _chunk_tokenizer
+
+
+# - xxh3 hashes several times faster per byte than MD5 (SIMD core); part of
+# - the "fast" optional dependency group like tokenizers/ijson. Swapping
+# - hashers invalidates stored signatures once, after which the mtime fast
+# - path in get_changed_files keeps rehashing rare anyway.
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
 def get_file_hash_and_mtime(file_path: str) -> tuple[str, float]:
     """
-    Get MD5 hash and modification time for file.
+    Get content hash and modification time for file.
+
+    Uses xxh3 when the optional xxhash package is installed, MD5 otherwise.
 
     Args:
         file_path: Path to file
 
     Returns:
-        (md5_hash, mtime)
+        (content_hash, mtime)
     """
     with open(file_path, "rb") as f:
-        file_hash = hashlib.md5(f.read()).hexdigest()
+        data = f.read()
+
+    if xxhash is not None:
+        file_hash = xxhash.xxh3_128_hexdigest(data)
+    else:
+        file_hash = hashlib.md5(data).hexdigest()
 
     mtime = os.path.getmtime(file_path)
 
     return file_hash, mtime
 
 
-def list_knowledge_files(
-    directory: str, recursive: bool = True, file_types: list[FileType] | None = None
-) -> list[str]:
+def _hash_and_mtime_safe(file_path: str) -> tuple[str, float] | None:
     """
-    List all knowledge files in directory.
+    Hash file, returning None if it is no longer accessible.
 
-    Args:
-        directory: Directory path
-        recursive: Recursively search subdirectories
-        file_types: File types to include (default: all supported types)
+    Thread-pool friendly variant of get_file_hash_and_mtime.
+    """
+    try:
+        return get_file_hash_and_mtime(file_path)
+    except (FileNotFoundError, PermissionError):
+        return None
+
+
+def _hash_files_parallel(file_paths: list[str]) -> list[tuple[str, float] | None]:
+    """
+    Hash files concurrently; hashing is I/O-bound and MD5 releases the GIL.
 
     Returns:
-        List of absolute paths to knowledge files (.md, .py, .pyx, .ipynb)
+        (hash, mtime) per path in input order, None for inaccessible files
+    """
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        return list(executor.map(_hash_and_mtime_safe, file_paths))
+
+
+def _chunk_cache_path(cache_dir: Path, content_hash: str, chunk_size: int, chunk_overlap: int) -> Path:
+    """
+    Cache file for one file's chunk texts, keyed by content hash and chunk
+    parameters (changing chunk_size/overlap must invalidate old entries).
+    """
+    return cache_dir / f"{content_hash}-{chunk_size}-{chunk_overlap}.json"
+
+
+def _load_chunk_cache(path: Path) -> list[str] | None:
+    """Load a cached chunk-text list, or None on miss/corruption."""
+    try:
+        return orjson.loads(path.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError, OSError):
+        return None
+
+
+def _build_extensions(file_types: list[FileType] | None) -> tuple[str, ...]:
+    """
+    Build tuple of file extensions (with dot) for the given file types.
     """
     if file_types is None:
         file_types = [FileType.MARKDOWN, FileType.PYTHON, FileType.JUPYTER]
 
-    # - Build set of extensions to match
     extensions = {f".{ft.value}" for ft in file_types}
 
     # - Add Cython (.pyx) for Python file type
     if FileType.PYTHON in file_types:
         extensions.add(".pyx")
 
-    knowledge_files = []
-    directory = Path(directory)
+    # - Tuple form so str.endswith can check all extensions in one C-level call
+    return tuple(extensions)
+
+
+def _scan_knowledge_files(path: str, extensions: tuple[str, ...], ignore_dirs: frozenset[str]):
+    """
+    Recursively yield knowledge file paths using os.scandir.
+
+    DirEntry objects carry cached type info from the directory read,
+    avoiding a stat syscall per entry (unlike os.walk + os.listdir).
+    """
+    # - Skip unreadable directories instead of aborting the whole walk
+    # - (matches os.walk's default onerror=None behavior)
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return
+
+    with entries:
+        for entry in entries:
+            # - Skip hidden files and directories
+            if entry.name.startswith("."):
+                continue
+
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignore_dirs:
+                    yield from _scan_knowledge_files(entry.path, extensions, ignore_dirs)
+            elif entry.is_file(follow_symlinks=False) and entry.name.endswith(extensions):
+                yield entry.path
+
+
+def list_knowledge_files(
+    directory: str, recursive: bool = True, file_types: list[FileType] | None = None
+) -> list[str]:
+    """
+    List all knowledge files in directory.
+
+    Args:
+        directory: Directory path
+        recursive: Recursively search subdirectories
+        file_types: File types to include (default: all supported types)
+
+    Returns:
+        List of absolute paths to knowledge files (.md, .py, .pyx, .ipynb)
+    """
+    extensions = _build_extensions(file_types)
 
     if recursive:
-        for root, dirs, files in os.walk(directory):
-            # - Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith(".")]
+        return list(_scan_knowledge_files(str(directory), extensions, _ignored_dirs()))
 
-            for file in files:
-                if not file.startswith(".") and any(file.endswith(ext) for ext in extensions):
-                    knowledge_files.append(str(Path(root) / file))
-    else:
-        for file in directory.iterdir():
-            if file.is_file() and file.suffix in extensions and not file.name.startswith("."):
-                knowledge_files.append(str(file))
+    # - Non-recursive: single-level scan (unreadable directory -> no files,
+    # - matching the recursive walk's skip behavior)
+    knowledge_files = []
+    try:
+        entries = os.scandir(str(directory))
+    except OSError:
+        return knowledge_files
+
+    with entries:
+        for entry in entries:
+            if (
+                not entry.name.startswith(".")
+                and entry.is_file(follow_symlinks=False)
+                and entry.name.endswith(extensions)
+            ):
+                knowledge_files.append(entry.path)
 
     return knowledge_files
 
@@ -100,6 +251,54 @@ def list_md_files(directory: str, recursive: bool = True) -> list[str]:
     return list_knowledge_files(directory, recursive, [FileType.MARKDOWN])
 
 
+def iter_knowledge_files_with_stat(
+    directory: str, recursive: bool = True, file_types: list[FileType] | None = None
+):
+    """
+    Yield (path, mtime, size) for knowledge files in a single traversal.
+
+    Fuses directory discovery and stat into one os.scandir pass so change
+    detection does not need a second stat/open call per file.
+
+    Args:
+        directory: Directory path
+        recursive: Recursively search subdirectories
+        file_types: File types to include (default: all supported types)
+
+    Yields:
+        (path, mtime, size) tuples
+    """
+    extensions = _build_extensions(file_types)
+    ignore_dirs = _ignored_dirs()
+
+    def _scan(path: str):
+        # - Skip unreadable directories instead of aborting the whole walk
+        # - (matches os.walk's default onerror=None behavior)
+        try:
+            entries = os.scandir(path)
+        except OSError:
+            return
+
+        with entries:
+            for entry in entries:
+                # - Skip hidden files and directories
+                if entry.name.startswith("."):
+                    continue
+
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.name not in ignore_dirs:
+                        yield from _scan(entry.path)
+                elif entry.is_file(follow_symlinks=False) and entry.name.endswith(extensions):
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        # - File vanished or became unreadable mid-walk
+                        continue
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+    yield from _scan(str(directory))
+
+
 def get_changed_files(directory: str, recursive: bool = True) -> list[str]:
     """
     Get list of changed/new knowledge files compared to tracking file.
@@ -114,30 +313,53 @@ def get_changed_files(directory: str, recursive: bool = True) -> list[str]:
     tracking_data = storage.load_tracking_file(directory)
     tracked_files = tracking_data.get("files", {})
 
+    # - In "mtime_size" mode the tracking signature is the file size (no hashing
+    # - at all); in "hash" mode it is the MD5 content hash
+    mtime_size_mode = get_config().rag.change_detection == "mtime_size"
+
     changed_files = []
-    all_knowledge_files = list_knowledge_files(directory, recursive)
+    hash_candidates = []  # (path, stored_hash) where mtime matched
 
-    for file_path in all_knowledge_files:
+    for file_path, current_mtime, current_size in iter_knowledge_files_with_stat(directory, recursive):
         if file_path not in tracked_files:
             # - New file
             changed_files.append(file_path)
             continue
 
-        try:
-            current_hash, current_mtime = get_file_hash_and_mtime(file_path)
-        except (FileNotFoundError, PermissionError):
-            # - File no longer accessible
+        stored_sig, stored_mtime = tracked_files[file_path]
+
+        if current_mtime != stored_mtime:
+            # - mtime moved: file changed, no need to hash
+            changed_files.append(file_path)
+            continue
+
+        if mtime_size_mode:
+            # - Compare size directly; legacy hash entries compare unequal and
+            # - get rewritten in the new format on the next tracking update
+            if current_size != stored_sig:
+                changed_files.append(file_path)
             continue
 
-        stored_hash, stored_mtime = tracked_files[file_path]
+        # - Same mtime: hash to catch content edits that preserved mtime
+        hash_candidates.append((file_path, stored_sig))
 
-        if current_hash != stored_hash or current_mtime != stored_mtime:
-            # - File changed
-            changed_files.append(file_path)
+    if hash_candidates:
+        # - Hash candidates concurrently (None = file no longer accessible)
+        results = _hash_files_parallel([path for path, _ in hash_candidates])
+        for (file_path, stored_hash), result in zip(hash_candidates, results):
+            if result is not None and result[0] != stored_hash:
+                # - File changed
+                changed_files.append(file_path)
 
     return changed_files
 
 
+# - Last-refresh timestamps per directory: seeded from the tracking file
+# - once, then kept in memory so the per-tool-call interval check touches
+# - no disk at all
+_last_refresh: dict[str, float] = {}
+
+
 def should_auto_refresh(directory: str) -> bool:
     """
     Check if auto-refresh interval has elapsed.
@@ -153,13 +375,12 @@ def should_auto_refresh(directory: str) -> bool:
     if not config.rag.auto_refresh:
         return False
 
-    tracking_data = storage.load_tracking_file(directory)
-    last_checked = tracking_data.get("last_checked", 0)
-    now = time.time()
+    last_checked = _last_refresh.get(directory)
+    if last_checked is None:
+        last_checked = storage.load_tracking_file(directory).get("last_checked", 0)
+        _last_refresh[directory] = last_checked
 
-    elapsed = now - last_checked
-
-    return elapsed >= config.rag.auto_refresh_interval
+    return time.time() - last_checked >= config.rag.auto_refresh_interval
 
 
 async def index_directory(
@@ -188,8 +409,7 @@ async def index_directory(
             progress_callback(msg)
     try:
         # - Validate directory path
-        validated_dir = validate_path(directory)
-        directory = str(validated_dir)
+        directory = validate_path_str(directory)
 
         config = get_config()
         collection_name = storage.get_collection_name(directory)
@@ -204,6 +424,9 @@ async def index_directory(
             _report("Dropping existing index...")
             if client.has_collection(collection_name):
                 client.drop_collection(collection_name)
+            # - Invalidate the ensured gate (and searcher caches) so the
+            # - ensure below actually recreates the collection
+            storage.forget_collection(client, collection_name)
 
             storage.ensure_collection(client, collection_name)
 
@@ -221,32 +444,60 @@ async def index_directory(
 
             if not changed_files:
                 _report("Already up to date")
-                return json.dumps(
-                    {"status": "success", "message": "Already up to date", "processed_files": 0, "total_chunks": 0},
-                    indent=2,
-                )
+                return _dumps({"status": "success", "message": "Already up to date", "processed_files": 0, "total_chunks": 0})
 
             # - Ensure collection exists
             storage.ensure_collection(client, collection_name)
 
-            # - Delete old chunks for changed files
+            # - Delete old chunks for changed files: one IN-filter RPC per batch
+            # - of paths instead of one round-trip per file
             _report(f"Found {len(changed_files)} changed files")
             _report("Removing old chunks...")
-            for file_path in changed_files:
+            delete_batch_size = 500  # Keep filter strings well below length limits
+            for i in range(0, len(changed_files), delete_batch_size):
+                batch = changed_files[i:i + delete_batch_size]
+                paths_literal = ", ".join('"{}"'.format(p.replace('"', '\\"')) for p in batch)
                 try:
-                    client.delete(collection_name=collection_name, filter=f'path == "{file_path}"')
+                    client.delete(collection_name=collection_name, filter=f"path in [{paths_literal}]")
                 except Exception:
-                    # - File might not have been indexed before
+                    # - Files might not have been indexed before
                     pass
 
             files_to_process = changed_files
             mode = "Incremental update"
 
-        # - Group files by type
+        # - Chunk cache lookup: parsing + token splitting are pure functions
+        # - of file content and chunk parameters, so chunk texts from earlier
+        # - runs are reused when the content hash matches (the big win is
+        # - force_reindex, which re-embeds files that never changed). The
+        # - hashes double as the tracking signatures written at the end.
+        chunk_cache_dir = storage.get_cache_directory(directory) / "chunks"
+        file_hashes: dict[str, tuple[str, float]] = {}
+        cached_chunks: list[tuple[str, str]] = []  # (file_path, chunk text)
+        uncached_files = []
+
+        _report("Checking chunk cache...")
+        for file_path, result in zip(files_to_process, _hash_files_parallel(files_to_process)):
+            if result is None:
+                # - File became inaccessible between discovery and hashing
+                continue
+            file_hashes[file_path] = result
+            cached = _load_chunk_cache(
+                _chunk_cache_path(chunk_cache_dir, result[0], config.rag.chunk_size, config.rag.chunk_overlap)
+            )
+            if cached is not None:
+                cached_chunks.extend((file_path, text) for text in cached)
+            else:
+                uncached_files.append(file_path)
+
+        if cached_chunks:
+            _report(f"Chunk cache: {len(files_to_process) - len(uncached_files)} files reused")
+
+        # - Group files by type (cache hits skip loading and chunking)
         files_by_type = {FileType.MARKDOWN: [], FileType.PYTHON: [], FileType.JUPYTER: []}
-        for file_path in files_to_process:
-            ext = Path(file_path).suffix.lstrip(".")
-            file_type = FileType.from_extension(ext)
+        for file_path in uncached_files:
+            # - Plain string split avoids a Path allocation per file
+            file_type = FileType.from_extension(file_path.rsplit(".", 1)[-1])
             if file_type:
                 files_by_type[file_type].append(file_path)
 
@@ -269,190 +520,335 @@ async def index_directory(
 
         documents = []
 
-        # - Load markdown files with SimpleDirectoryReader
+        # - Size filter (done synchronously so only surviving files hit the pool)
+        max_size_bytes = config.rag.max_file_size_mb * 1024 * 1024
+
+        def _filter_large(paths: list[str]) -> tuple[list[str], int]:
+            """Split paths into (files to load, count skipped as too large)."""
+            to_load = []
+            skipped = 0
+            for path in paths:
+                if Path(path).stat().st_size > max_size_bytes:
+                    skipped += 1
+                else:
+                    to_load.append(path)
+            return to_load, skipped
+
+        # - Metadata captured during loading (Python/Jupyter parse() yields
+        # - both text and metadata from one read, so the template pass below
+        # - doesn't have to re-open and re-parse those files)
+        parsed_metadata: dict[str, metadata_module.DocumentMetadata] = {}
+
+        def _load_md(path: str) -> Document:
+            """Load a markdown file into a Document (runs in worker thread)."""
+            text = Path(path).read_text(encoding="utf-8", errors="replace")
+            return Document(text=text, metadata={"file_path": path, "file_name": Path(path).name})
+
+        def _load_py(path: str) -> Document:
+            """Load a Python file into a Document (runs in worker thread)."""
+            from xlmcp.tools.rag.parsers import PythonParser
+
+            text, meta = PythonParser.parse(path)
+            parsed_metadata[path] = meta
+            return Document(text=text, metadata={"file_path": path, "file_name": Path(path).name})
+
+        def _load_nb(path: str) -> Document:
+            """Load a Jupyter notebook into a Document (runs in worker thread)."""
+            from xlmcp.tools.rag.parsers import JupyterParser
+
+            text, meta = JupyterParser.parse(path, skip_outputs=config.rag.skip_notebook_outputs)
+            parsed_metadata[path] = meta
+            return Document(text=text, metadata={"file_path": path, "file_name": Path(path).name})
+
+        # - Load markdown files directly: a plain read + Document beats the
+        # - generic SimpleDirectoryReader pipeline, which re-detects the file
+        # - type and walks its reader dispatch per file we already know is .md
         if files_by_type[FileType.MARKDOWN]:
             _report(f"Loading {len(files_by_type[FileType.MARKDOWN])} markdown files...")
-            md_docs = SimpleDirectoryReader(
-                input_files=files_by_type[FileType.MARKDOWN], required_exts=[".md"]
-            ).load_data()
-            documents.extend(md_docs)
+            to_load, skipped_large = _filter_large(files_by_type[FileType.MARKDOWN])
+
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                documents.extend(executor.map(_load_md, to_load))
+
+            if skipped_large > 0:
+                _report(f"  Skipped {skipped_large} markdown files > {config.rag.max_file_size_mb}MB")
 
-        # - Load Python files (extract full text)
+        # - Load Python files (extract full text), reading files in parallel
         if files_by_type[FileType.PYTHON]:
             _report(f"Loading {len(files_by_type[FileType.PYTHON])} Python files...")
-            skipped_large = 0
-            for py_file in files_by_type[FileType.PYTHON]:
-                # - Check file size
-                file_size_mb = Path(py_file).stat().st_size / (1024 * 1024)
-                if file_size_mb > config.rag.max_file_size_mb:
-                    skipped_large += 1
-                    continue
-
-                from xlmcp.tools.rag.parsers import PythonParser
+            to_load, skipped_large = _filter_large(files_by_type[FileType.PYTHON])
 
-                text = PythonParser.extract_text(py_file)
-                doc = Document(text=text, metadata={"file_path": py_file, "file_name": Path(py_file).name})
-                documents.append(doc)
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                documents.extend(executor.map(_load_py, to_load))
 
             if skipped_large > 0:
                 _report(f"  Skipped {skipped_large} Python files > {config.rag.max_file_size_mb}MB")
 
-        # - Load Jupyter notebooks (extract cells + outputs)
+        # - Load Jupyter notebooks (extract cells + outputs), reading files in parallel
         if files_by_type[FileType.JUPYTER]:
             _report(f"Loading {len(files_by_type[FileType.JUPYTER])} Jupyter notebooks...")
-            skipped_large = 0
-            for nb_file in files_by_type[FileType.JUPYTER]:
-                # - Check file size
-                file_size_mb = Path(nb_file).stat().st_size / (1024 * 1024)
-                if file_size_mb > config.rag.max_file_size_mb:
-                    skipped_large += 1
-                    continue
+            to_load, skipped_large = _filter_large(files_by_type[FileType.JUPYTER])
 
-                from xlmcp.tools.rag.parsers import JupyterParser
-
-                text = JupyterParser.extract_text(nb_file, skip_outputs=config.rag.skip_notebook_outputs)
-                doc = Document(text=text, metadata={"file_path": nb_file, "file_name": Path(nb_file).name})
-                documents.append(doc)
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                documents.extend(executor.map(_load_nb, to_load))
 
             if skipped_large > 0:
                 _report(f"  Skipped {skipped_large} Jupyter notebooks > {config.rag.max_file_size_mb}MB")
 
-        if not documents:
-            return json.dumps(
-                {"status": "success", "message": "No documents to index", "processed_files": 0, "total_chunks": 0},
-                indent=2,
-            )
+        if not documents and not cached_chunks:
+            return _dumps({"status": "success", "message": "No documents to index", "processed_files": 0, "total_chunks": 0})
 
-        # - Build file_path -> metadata mapping
+        # - Build file_path -> entity template mapping: all chunks of one file
+        # - share their metadata fields, so serialize each file's metadata once.
+        # - Frontmatter parses are additionally cached in the tracking file
+        # - keyed by mtime, so a force_reindex re-extracts only edited files
+        # - (Python/Jupyter metadata comes from the load pass above).
         _report("Extracting metadata...")
-        file_metadata = {}
+        # - Off-thread: the first load of a large tracking file is blocking
+        # - disk I/O (later calls hit the in-process mtime cache)
+        tracking_data = await asyncio.to_thread(storage.load_tracking_file, directory)
+        meta_cache = tracking_data.setdefault("meta_cache", {})
+        file_metas: dict[str, metadata_module.DocumentMetadata] = {}
+        to_extract: list[tuple[str, int]] = []
         for file_path in files_to_process:
+            meta = parsed_metadata.get(file_path)
+            if meta is not None:
+                file_metas[file_path] = meta
+                continue
+            try:
+                mtime_ns = os.stat(file_path).st_mtime_ns
+            except (FileNotFoundError, PermissionError):
+                continue
+            cached_meta = meta_cache.get(file_path)
+            if cached_meta is not None and cached_meta.get("mtime_ns") == mtime_ns:
+                file_metas[file_path] = metadata_module.DocumentMetadata(**cached_meta["meta"])
+            else:
+                to_extract.append((file_path, mtime_ns))
+
+        if to_extract:
+            # - Each extraction is an open+read+parse; overlap the reads in
+            # - the same thread-pool shape used for hashing and loading
+            def _extract_safe(path: str) -> metadata_module.DocumentMetadata | None:
+                try:
+                    return metadata_module.extract_metadata(path)
+                except Exception:
+                    # - Skip files with metadata extraction errors
+                    return None
+
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+                extracted = executor.map(_extract_safe, [path for path, _ in to_extract])
+            for (file_path, mtime_ns), meta in zip(to_extract, extracted):
+                if meta is None:
+                    continue
+                file_metas[file_path] = meta
+                meta_cache[file_path] = {"mtime_ns": mtime_ns, "meta": meta.model_dump()}
+
+        file_templates = {}
+        for file_path, meta in file_metas.items():
             try:
-                file_metadata[file_path] = metadata_module.extract_metadata(file_path)
+                file_templates[file_path] = metadata_module.build_entity_template(meta)
             except Exception:
-                # - Skip files with metadata extraction errors
                 continue
 
+        # - Fallback template for files whose metadata extraction failed
+        empty_template = metadata_module.build_entity_template(metadata_module.DocumentMetadata())
+
         # - Parse structure (only for markdown, keep Python/Jupyter as-is)
         _report("Parsing documents...")
-        from llama_index.core.schema import TextNode
+        md_parser = MarkdownNodeParser()
 
         nodes = []
         for doc in documents:
+            # - Skip documents too short to ever yield a valid chunk (min 50
+            # - chars, same cutoff as the post-chunk filter) before tokenizing
+            if len(doc.text.strip()) < 50:
+                continue
+
             file_path = doc.metadata.get("file_path")
-            ext = Path(file_path).suffix.lstrip(".")
+            ext = file_path.rsplit(".", 1)[-1].lower()
 
             if ext == "md":
                 # - Use MarkdownNodeParser for markdown
-                parsed = MarkdownNodeParser().get_nodes_from_documents([doc])
-                nodes.extend(parsed)
+                nodes.extend(md_parser.get_nodes_from_documents([doc]))
             else:
-                # - Keep as-is for Python/Jupyter (already structured)
-                node = TextNode(text=doc.text, metadata=doc.metadata)
-                nodes.append(node)
+                # - Python/Jupyter documents go to the splitter directly
+                # - (already structured, no intermediate TextNode wrap needed)
+                nodes.append(doc)
 
-        # - Split into chunks
+        # - Split into chunks with a single splitter instance
         _report(f"Chunking {len(nodes)} nodes...")
-        chunked_nodes = TokenTextSplitter(
-            chunk_size=config.rag.chunk_size, chunk_overlap=config.rag.chunk_overlap
-        ).get_nodes_from_documents(nodes)
+        tokenizer = _get_chunk_tokenizer()
+        if tokenizer is not None:
+            splitter = TokenTextSplitter(
+                chunk_size=config.rag.chunk_size, chunk_overlap=config.rag.chunk_overlap, tokenizer=tokenizer
+            )
+        else:
+            splitter = TokenTextSplitter(chunk_size=config.rag.chunk_size, chunk_overlap=config.rag.chunk_overlap)
+        chunked_nodes = splitter.get_nodes_from_documents(nodes)
 
-        # - Filter empty and very short chunks (minimum 50 characters)
+        # - Filter empty and very short chunks (minimum 50 characters) and
+        # - collect the embedding texts in the same pass - node.text is a
+        # - property lookup, so touch it once per chunk
         # - Very short chunks (like "Share this..." or "About the CD-ROM...") cause poor search results
-        chunked_nodes = [node for node in chunked_nodes if len(node.text.strip()) >= 50]
+        kept_nodes = []
+        texts = []
+        new_chunks_by_file: dict[str, list[str]] = {}
+        for node in chunked_nodes:
+            text = node.text
+            if len(text.strip()) >= 50:
+                kept_nodes.append(node)
+                texts.append(text)
+                new_chunks_by_file.setdefault(node.metadata.get("file_path"), []).append(text)
+
+        # - Persist this run's chunk texts keyed by content hash so the next
+        # - reindex of unchanged files skips the parse + split entirely
+        if new_chunks_by_file:
+            try:
+                chunk_cache_dir.mkdir(exist_ok=True)
+                for file_path, file_texts in new_chunks_by_file.items():
+                    hashed = file_hashes.get(file_path)
+                    if hashed is not None:
+                        _chunk_cache_path(
+                            chunk_cache_dir, hashed[0], config.rag.chunk_size, config.rag.chunk_overlap
+                        ).write_bytes(orjson.dumps(file_texts))
+            except OSError:
+                # - Cache is best-effort; indexing proceeds without it
+                pass
+
+        # - Splice in the cache-hit chunks (they bypassed loading and the
+        # - splitter; the insert loop only needs text + file identity)
+        for file_path, text in cached_chunks:
+            kept_nodes.append(Document(text=text, metadata={"file_path": file_path, "file_name": os.path.basename(file_path)}))
+            texts.append(text)
+
+        chunked_nodes = kept_nodes
 
         if not chunked_nodes:
-            return json.dumps(
-                {
+            return _dumps({
                     "status": "success",
                     "message": "No content to index (all chunks empty)",
                     "processed_files": len(files_to_process),
                     "total_chunks": 0,
-                },
-                indent=2,
-            )
-
-        # - Extract text for embedding
-        texts = [node.text for node in chunked_nodes]
-
-        # - Generate embeddings with progress
-        _report(f"Generating embeddings for {len(chunked_nodes)} chunks...")
-
-        # - Batch processing for progress reporting
-        batch_size = 1000
-        vectors = []
-
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i + batch_size]
-            batch_vectors = embedding_fn.encode_documents(batch_texts)
-            vectors.extend(batch_vectors)
-
-            # - Report progress every batch
-            processed = min(i + batch_size, len(texts))
-            _report(f"  Embeddings: {processed}/{len(texts)} ({100 * processed // len(texts)}%)")
-
-        _report(f"  Embeddings: {len(texts)}/{len(texts)} (100%) - Complete!")
-
-        # - Build entity dicts
-        _report("Building index entries...")
-        data = []
-        for vector, node in zip(vectors, chunked_nodes):
-            file_path = node.metadata.get("file_path")
-            filename = node.metadata.get("file_name")
-
-            # - Get metadata for this file
-            doc_metadata = file_metadata.get(file_path)
-            if not doc_metadata:
-                # - Fallback to empty metadata
-                doc_metadata = metadata_module.DocumentMetadata()
-
-            # - Build entity dict
-            entity_dict = metadata_module.build_entity_dict(node.text, doc_metadata, filename, file_path)
-            entity_dict["vector"] = vector
-
-            data.append(entity_dict)
-
-        # - Insert into Milvus
-        _report(f"Inserting {len(data)} chunks into index...")
-        insert_result = client.insert(collection_name=collection_name, data=data)
-
-        # - Update tracking file
+                })
+
+        # - Embed and insert batch by batch: peak memory stays bounded by the
+        # - batch size instead of materializing every entity dict (with its
+        # - full embedding vector) for the whole corpus before one giant insert
+        _report(f"Embedding and inserting {len(chunked_nodes)} chunks...")
+
+        batch_size = config.rag.embedding_batch_size
+
+        # - Single-worker pool: the previous batch's insert runs while the
+        # - next batch is being embedded, hiding the Milvus write behind the
+        # - CPU-bound encode call
+        # - Local bindings: dict.get through a local skips the repeated
+        # - attribute lookups in the per-chunk loop below
+        templates_get = file_templates.get
+
+        insert_future = None
+        with ThreadPoolExecutor(max_workers=1) as insert_pool:
+            for i in range(0, len(texts), batch_size):
+                # - Keep embeddings as one float32 ndarray; rows go to pymilvus
+                # - directly (4 bytes/dim instead of 28-byte Python floats)
+                batch_vectors = np.asarray(embedding_fn.encode_documents(texts[i:i + batch_size]), dtype=np.float32)
+
+                # - Build this batch's entity dicts from the per-file templates:
+                # - dict.copy of the fixed-key prototype plus four C-level
+                # - assignments, instead of re-packing a literal and unpacking
+                # - the template per chunk
+                batch_data = []
+                for vector, node, text in zip(batch_vectors, chunked_nodes[i:i + batch_size], texts[i:i + batch_size]):
+                    node_meta = node.metadata
+                    file_path = node_meta.get("file_path")
+
+                    entity = templates_get(file_path, empty_template).copy()
+                    entity["text"] = text
+                    entity["filename"] = node_meta.get("file_name")
+                    entity["path"] = file_path
+                    entity["vector"] = vector
+                    batch_data.append(entity)
+
+                # - Wait for the in-flight insert before submitting the next one
+                if insert_future is not None:
+                    insert_future.result()
+                insert_future = insert_pool.submit(client.insert, collection_name=collection_name, data=batch_data)
+
+                # - Report progress every batch
+                processed = min(i + batch_size, len(texts))
+                _report(f"  Indexed: {processed}/{len(texts)} ({100 * processed // len(texts)}%)")
+
+            if insert_future is not None:
+                insert_future.result()
+
+        _report(f"  Indexed: {len(texts)}/{len(texts)} (100%) - Complete!")
+
+        # - Update tracking file (same dict the metadata pass annotated)
         _report("Updating tracking file...")
-        tracking_data = storage.load_tracking_file(directory)
         tracking_data["last_checked"] = time.time()
 
-        if "files" not in tracking_data:
-            tracking_data["files"] = {}
+        # - Per-file tag index: {path: {"tags": [...], "chunks": n}} so
+        # - get_all_tags can aggregate counts from this small map instead of
+        # - scanning every row's tags_str out of Milvus
+        chunks_per_file: dict[str, int] = {path: len(chunk_texts) for path, chunk_texts in new_chunks_by_file.items()}
+        for file_path, _text in cached_chunks:
+            chunks_per_file[file_path] = chunks_per_file.get(file_path, 0) + 1
 
+        if force_reindex:
+            # - Full rebuild: drop stale entries for files that no longer exist
+            tag_index = tracking_data["tag_index"] = {}
+        else:
+            tag_index = tracking_data.setdefault("tag_index", {})
+        for file_path, chunk_count in chunks_per_file.items():
+            meta = file_metas.get(file_path)
+            tag_index[file_path] = {"tags": meta.tags if meta is not None else [], "chunks": chunk_count}
+        # - Drop entries for processed files that yielded no chunks this run
+        # - (e.g. emptied files): their old counts would otherwise linger
         for file_path in files_to_process:
-            try:
-                tracking_data["files"][file_path] = list(get_file_hash_and_mtime(file_path))
-            except (FileNotFoundError, PermissionError):
-                # - Skip files that became inaccessible
-                pass
+            if file_path not in chunks_per_file:
+                tag_index.pop(file_path, None)
+
+        if "files" not in tracking_data:
+            tracking_data["files"] = {}
 
-        storage.save_tracking_file(directory, tracking_data)
+        if config.rag.change_detection == "mtime_size":
+            # - No hashing: track [size, mtime] from a single stat per file
+            for file_path in files_to_process:
+                try:
+                    stat = os.stat(file_path)
+                    tracking_data["files"][file_path] = [stat.st_size, stat.st_mtime]
+                except (FileNotFoundError, PermissionError):
+                    # - Skip files that became inaccessible
+                    pass
+        else:
+            # - Reuse the hashes computed for the chunk-cache pass instead of
+            # - re-reading and re-hashing every file a second time
+            for file_path in files_to_process:
+                hashed = file_hashes.get(file_path)
+                if hashed is not None:
+                    tracking_data["files"][file_path] = list(hashed)
+                # - Missing entry: file became inaccessible before hashing
+
+        # - Off-thread write so concurrent tool calls keep the event loop free
+        await asyncio.to_thread(storage.save_tracking_file, directory, tracking_data)
+        _last_refresh[directory] = tracking_data["last_checked"]
 
         # - Calculate elapsed time
         elapsed_time = time.time() - start_time
         _report(f"Completed in {elapsed_time:.1f}s")
 
-        return json.dumps(
-            {
+        return _dumps({
                 "status": "success",
                 "message": mode,
                 "processed_files": len(files_to_process),
                 "total_chunks": len(chunked_nodes),
                 "elapsed_seconds": round(elapsed_time, 2),
                 "files": [os.path.basename(f) for f in files_to_process[:10]],  # First 10 files
-            },
-            indent=2,
-        )
+            })
 
     except PermissionError as e:
-        return json.dumps({"status": "error", "message": f"Permission denied: {e}"}, indent=2)
+        return _dumps({"status": "error", "message": f"Permission denied: {e}"})
     except Exception as e:
-        return json.dumps({"status": "error", "message": str(e)}, indent=2)
+        return _dumps({"status": "error", "message": str(e)})
 
 
 async def refresh_index(directory: str | None = None, recursive: bool = True) -> str:
@@ -472,7 +868,7 @@ async def refresh_index(directory: str | None = None, recursive: bool = True) ->
     else:
         # - Refresh all indexed directories
         indexes_json = await storage.list_all_indexes()
-        indexes_data = json.loads(indexes_json)
+        indexes_data = orjson.loads(indexes_json)
 
         results = []
         for index_info in indexes_data.get("indexes", []):
@@ -481,7 +877,7 @@ async def refresh_index(directory: str | None = None, recursive: bool = True) ->
             # - For now, skip this functionality
             pass
 
-        return json.dumps({"status": "error", "message": "Refresh all not implemented yet"}, indent=2)
+        return _dumps({"status": "error", "message": "Refresh all not implemented yet"})
 
 
 async def auto_refresh_if_needed(directory: str, recursive: bool = True):
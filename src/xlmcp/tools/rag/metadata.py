@@ -3,16 +3,87 @@ Metadata extraction from knowledge files.
 Handles YAML frontmatter, inline hashtags, Python AST parsing, and Jupyter notebooks.
 """
 
-import json
 import re
 from pathlib import Path
 from typing import Any
 
 import frontmatter
+import orjson
+import yaml
 
 from xlmcp.tools.rag.models import DocumentEntity, DocumentMetadata, FileType
 from xlmcp.tools.rag.parsers import JupyterParser, PythonParser
 
+# - Prefer libyaml's C loader for frontmatter blocks (same pattern as
+# - registry.py): identical type coercion, several times faster than the
+# - pure-Python SafeLoader that python-frontmatter defaults to
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class _CYAMLHandler(frontmatter.YAMLHandler):
+    """YAML frontmatter handler that loads through libyaml when available."""
+
+    def load(self, fm: str, **kwargs):
+        kwargs.setdefault("Loader", _YamlLoader)
+        return yaml.load(fm, **kwargs)
+
+
+_YAML_HANDLER = _CYAMLHandler()
+
+# - Single combined scanner for hashtag extraction (hot path: called once per
+# - document). One alternation walks the text once: regions to ignore (code,
+# - HTML, CSS) are consumed by the unnamed branches, candidate tags land in
+# - the named group. This replaces five .sub() passes that each allocated a
+# - full copy of the document before the tag scan even started.
+# - Branch order matters: fences before inline code (both start with a
+# - backtick) and <style> blocks before the generic tag branch.
+_TAG_SCAN_RE = re.compile(
+    r"```[\s\S]*?```"  # fenced code blocks
+    r"|`[^`]*`"  # inline code
+    r"|<style[\s\S]*?</style>"  # CSS style blocks
+    r"|<[^>]+>"  # HTML/XML tags (attributes included)
+    r"""|\bstyle\s*=\s*['"][^'"]*['"]"""  # stray inline style attributes
+    r"|(?P<tag>#[a-zA-Z][a-zA-Z0-9_-]*)",  # hashtag candidates
+    re.IGNORECASE,
+)
+# - No ^ anchor: match() already anchors at pos, so this works with a start offset
+_HEADING_RE = re.compile(r"h\d+$", re.IGNORECASE)
+
+
+def is_hex_color(tag: str) -> bool:
+    """Check if tag looks like a hex color code."""
+    # - Remove the # prefix
+    without_hash = tag[1:] if tag.startswith('#') else tag
+    # - Valid hex colors have 3, 4, 6, or 8 hex digits
+    # - Exclude "_" explicitly: int() accepts it as a digit separator
+    if len(without_hash) not in (3, 4, 6, 8) or "_" in without_hash:
+        return False
+    # - int(s, 16) is a tight C loop that rejects invalid chars early,
+    # - much faster than a regex match on these short strings
+    try:
+        int(without_hash, 16)
+        return True
+    except ValueError:
+        return False
+
+
+def is_heading_marker(tag: str) -> bool:
+    """Check if tag looks like a markdown heading marker (#h0, #h1, etc.)."""
+    without_hash = tag[1:] if tag.startswith('#') else tag
+    # - Match h followed by digits (e.g., h0, h1, h2, h10)
+    return bool(_HEADING_RE.match(without_hash))
+
+
+def is_valid_tag(tag: str) -> bool:
+    """Check if tag is valid (not a color, not a heading, not too short)."""
+    if len(tag) <= 2:  # Too short (just # + 1 char)
+        return False
+    if is_hex_color(tag):
+        return False
+    if is_heading_marker(tag):
+        return False
+    return True
+
 
 def extract_inline_hashtags(text: str) -> list[str]:
     """
@@ -27,56 +98,25 @@ def extract_inline_hashtags(text: str) -> list[str]:
     Returns:
         List of unique hashtags (including #)
     """
-    # - Remove code blocks (``` ... ```)
-    text = re.sub(r"```[\s\S]*?```", "", text)
-
-    # - Remove inline code (` ... `)
-    text = re.sub(r"`[^`]*`", "", text)
-
-    # - Remove HTML/XML tags completely (including style attributes)
-    # - This removes <tag attr="value">content</tag> and <tag attr="value" />
-    text = re.sub(r"<[^>]+>", "", text)
-
-    # - Remove CSS style blocks
-    text = re.sub(r"<style[\s\S]*?</style>", "", text, flags=re.IGNORECASE)
-
-    # - Remove inline style attributes that might have been left (style="...")
-    text = re.sub(r"""\bstyle\s*=\s*['"][^'"]*['"]""", "", text, flags=re.IGNORECASE)
-
-    # - Find hashtags: # followed by letter, then letters/numbers/hyphens/underscores
-    pattern = r"#[a-zA-Z][a-zA-Z0-9_-]*"
-    tags = re.findall(pattern, text)
-
-    # - Filter out hex color codes and false positives
-    def is_hex_color(tag: str) -> bool:
-        """Check if tag looks like a hex color code."""
-        # - Remove the # prefix
-        without_hash = tag[1:] if tag.startswith('#') else tag
-        # - Check if it's only hex digits and has valid length (3, 4, 6, or 8)
-        if re.match(r'^[a-fA-F0-9]+$', without_hash, re.IGNORECASE):
-            return len(without_hash) in (3, 4, 6, 8)
-        return False
-
-    def is_heading_marker(tag: str) -> bool:
-        """Check if tag looks like a markdown heading marker (#h0, #h1, etc.)."""
-        without_hash = tag[1:] if tag.startswith('#') else tag
-        # - Match h followed by digits (e.g., h0, h1, h2, h10)
-        return bool(re.match(r'^h\d+$', without_hash, re.IGNORECASE))
-
-    def is_valid_tag(tag: str) -> bool:
-        """Check if tag is valid (not a color, not a heading, not too short)."""
-        if len(tag) <= 2:  # Too short (just # + 1 char)
-            return False
-        if is_hex_color(tag):
-            return False
-        if is_heading_marker(tag):
-            return False
-        return True
-
-    tags = [tag for tag in tags if is_valid_tag(tag)]
+    # - Prefilter: most knowledge files contain no hashtags at all, and a
+    # - C-level substring scan is orders of magnitude cheaper than walking
+    # - the combined pattern's state machine over the whole document
+    if "#" not in text:
+        return []
+
+    # - One finditer pass over the original text: ignored regions (code
+    # - blocks, inline code, HTML tags, CSS) are consumed by the skip
+    # - branches of the combined pattern; only the named group yields tag
+    # - candidates, which are validated and deduplicated while iterating
+    # - (skipping hex color codes, heading markers, and too-short tags)
+    seen = set()
+    for match in _TAG_SCAN_RE.finditer(text):
+        tag = match.group("tag")
+        if tag is not None and is_valid_tag(tag):
+            seen.add(tag)
 
     # - Return unique tags (case-sensitive)
-    return list(set(tags))
+    return list(seen)
 
 
 def parse_float_safe(value: Any) -> float | None:
@@ -92,6 +132,33 @@ def parse_float_safe(value: Any) -> float | None:
         return None
 
 
+def parse_frontmatter_bytes(data: bytes) -> tuple[dict, str]:
+    """
+    Parse YAML frontmatter from already-read markdown bytes.
+
+    The primitive behind parse_frontmatter: callers that batch their reads
+    (or never touch the filesystem at all) pass bytes directly instead of
+    forcing a second open of the same file.
+
+    Args:
+        data: Raw markdown file content
+
+    Returns:
+        (frontmatter_dict, content)
+    """
+    try:
+        raw = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return {}, ""
+
+    try:
+        post = frontmatter.loads(raw, handler=_YAML_HANDLER)
+        return dict(post.metadata), post.content
+    except Exception:
+        # - Catch any frontmatter parsing errors
+        return {}, raw
+
+
 def parse_frontmatter(file_path: str) -> tuple[dict, str]:
     """
     Parse YAML frontmatter from markdown file.
@@ -103,20 +170,12 @@ def parse_frontmatter(file_path: str) -> tuple[dict, str]:
         (frontmatter_dict, content)
     """
     try:
-        with open(file_path, encoding="utf-8") as f:
-            post = frontmatter.load(f)
-            return dict(post.metadata), post.content
-    except (FileNotFoundError, PermissionError, UnicodeDecodeError):
+        data = Path(file_path).read_bytes()
+    except (FileNotFoundError, PermissionError, OSError):
         # - Return empty frontmatter if file can't be read
         return {}, ""
-    except Exception:
-        # - Catch any frontmatter parsing errors
-        try:
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
-            return {}, content
-        except Exception:
-            return {}, ""
+
+    return parse_frontmatter_bytes(data)
 
 
 def extract_metadata(file_path: str) -> DocumentMetadata:
@@ -149,6 +208,28 @@ def extract_metadata(file_path: str) -> DocumentMetadata:
         return DocumentMetadata()
 
 
+def extract_metadata_bytes(data: bytes, path_hint: str) -> DocumentMetadata:
+    """
+    Extract metadata from already-read file bytes.
+
+    Bytes-based counterpart of extract_metadata for callers that batch
+    their reads. Only markdown can be parsed from bytes today; the Python
+    and Jupyter parsers are file-based, so other extensions return an
+    empty DocumentMetadata.
+
+    Args:
+        data: Raw file content
+        path_hint: File name or path used to detect the file type
+
+    Returns:
+        DocumentMetadata with all extracted fields
+    """
+    ext = Path(path_hint).suffix.lstrip(".")
+    if FileType.from_extension(ext) == FileType.MARKDOWN:
+        return _markdown_metadata_from_parts(*parse_frontmatter_bytes(data))
+    return DocumentMetadata()
+
+
 def _extract_markdown_metadata(file_path: str) -> DocumentMetadata:
     """
     Extract complete metadata from markdown file.
@@ -162,12 +243,31 @@ def _extract_markdown_metadata(file_path: str) -> DocumentMetadata:
         DocumentMetadata with all extracted fields
     """
     fm_data, content = parse_frontmatter(file_path)
+    return _markdown_metadata_from_parts(fm_data, content)
+
+
+def _markdown_metadata_from_parts(fm_data: dict, content: str) -> DocumentMetadata:
+    """
+    Build DocumentMetadata from parsed frontmatter and markdown content.
+
+    Args:
+        fm_data: Parsed frontmatter dict
+        content: Markdown body (frontmatter stripped)
+
+    Returns:
+        DocumentMetadata with all extracted fields
+    """
+    # - Single case-insensitive view of the frontmatter keys (fields like
+    # - "Created"/"created" appear in both spellings across corpora).
+    # - str(key): YAML happily parses int/date keys (e.g. "2023: notes")
+    # - and .lower() would raise AttributeError on those
+    fm_lower = {str(key).lower(): value for key, value in fm_data.items()}
 
     # - Extract inline hashtags from content (already filtered)
     inline_tags = extract_inline_hashtags(content)
 
     # - Get frontmatter tags (could be list or string)
-    fm_tags = fm_data.get("tags", [])
+    fm_tags = fm_lower.get("tags", [])
     if isinstance(fm_tags, str):
         # - Handle comma-separated tags
         fm_tags = [tag.strip() for tag in fm_tags.split(",")]
@@ -185,24 +285,7 @@ def _extract_markdown_metadata(file_path: str) -> DocumentMetadata:
 
     # - Filter frontmatter tags (same rules as inline tags)
     # - This removes hex colors, heading markers, and very short tags
-    filtered_fm_tags = []
-    for tag in normalized_fm_tags:
-        # - Reuse the filtering logic from extract_inline_hashtags
-        without_hash = tag[1:] if tag.startswith('#') else tag
-
-        # - Skip if too short
-        if len(tag) <= 2:
-            continue
-
-        # - Skip if hex color (3, 4, 6, or 8 hex digits)
-        if re.match(r'^[a-fA-F0-9]+$', without_hash, re.IGNORECASE) and len(without_hash) in (3, 4, 6, 8):
-            continue
-
-        # - Skip if heading marker (h0, h1, etc.)
-        if re.match(r'^h\d+$', without_hash, re.IGNORECASE):
-            continue
-
-        filtered_fm_tags.append(tag)
+    filtered_fm_tags = [tag for tag in normalized_fm_tags if is_valid_tag(tag)]
 
     # - Combine and deduplicate tags
     all_tags = list(set(filtered_fm_tags + inline_tags))
@@ -210,43 +293,62 @@ def _extract_markdown_metadata(file_path: str) -> DocumentMetadata:
 
     # - Extract other metadata fields
     # - Handle "Type" field (reserved keyword) -> type_field
-    type_value = fm_data.get("Type") or fm_data.get("type")
+    type_value = fm_lower.get("type")
 
     # - Build metadata object
     metadata = DocumentMetadata(
         file_type=FileType.MARKDOWN.value,
         tags=all_tags,
-        created=str(fm_data.get("Created") or fm_data.get("created") or ""),
-        author=str(fm_data.get("Author") or fm_data.get("author") or ""),
+        created=str(fm_lower.get("created") or ""),
+        author=str(fm_lower.get("author") or ""),
         type_field=str(type_value) if type_value else None,
-        strategy=str(fm_data.get("strategy") or "") or None,
-        sharpe=parse_float_safe(fm_data.get("sharpe")),
-        cagr=parse_float_safe(fm_data.get("cagr")),
-        drawdown=parse_float_safe(fm_data.get("drawdown")),
+        strategy=str(fm_lower.get("strategy") or "") or None,
+        sharpe=parse_float_safe(fm_lower.get("sharpe")),
+        cagr=parse_float_safe(fm_lower.get("cagr")),
+        drawdown=parse_float_safe(fm_lower.get("drawdown")),
         custom={},
     )
 
-    # - Store other frontmatter fields in custom
-    skip_fields = {
-        "tags",
-        "Created",
-        "created",
-        "Author",
-        "author",
-        "Type",
-        "type",
-        "strategy",
-        "sharpe",
-        "cagr",
-        "drawdown",
-    }
+    # - Store other frontmatter fields in custom (case-insensitive skip)
+    skip_fields = {"tags", "created", "author", "type", "strategy", "sharpe", "cagr", "drawdown"}
     for key, value in fm_data.items():
-        if key not in skip_fields:
+        if str(key).lower() not in skip_fields:
             metadata.custom[key] = value
 
     return metadata
 
 
+def build_entity_template(metadata: DocumentMetadata) -> dict:
+    """
+    Build the per-file constant part of a Milvus entity dict.
+
+    All chunks of one file share these fields, so computing them once per
+    file avoids re-serializing identical metadata for every chunk.
+
+    Args:
+        metadata: Document metadata
+
+    Returns:
+        Dict with the metadata-derived entity fields
+    """
+    return {
+        # - Native tag list (filterable with json_contains, unlike the
+        # - serialized tags_str which needs a substring scan per row)
+        "tags": metadata.tags,
+        # - Flattened metadata for filtering (orjson is several times faster
+        # - than stdlib json / pydantic serialization on this path)
+        "tags_str": orjson.dumps(metadata.tags).decode(),
+        "type_field": metadata.type_field,
+        "strategy": metadata.strategy,
+        "sharpe": metadata.sharpe,
+        "cagr": metadata.cagr,
+        "drawdown": metadata.drawdown,
+        # - Full metadata as JSON. OPT_NON_STR_KEYS: custom frontmatter
+        # - fields can hold YAML mappings with non-string keys
+        "metadata_json": orjson.dumps(metadata.model_dump(), option=orjson.OPT_NON_STR_KEYS).decode(),
+    }
+
+
 def build_entity_dict(chunk: str, metadata: DocumentMetadata, filename: str, path: str) -> dict:
     """
     Build Milvus entity dict from chunk and metadata.
@@ -264,13 +366,5 @@ def build_entity_dict(chunk: str, metadata: DocumentMetadata, filename: str, pat
         "text": chunk,
         "filename": filename,
         "path": path,
-        # - Flattened metadata for filtering
-        "tags_str": json.dumps(metadata.tags),
-        "type_field": metadata.type_field,
-        "strategy": metadata.strategy,
-        "sharpe": metadata.sharpe,
-        "cagr": metadata.cagr,
-        "drawdown": metadata.drawdown,
-        # - Full metadata as JSON
-        "metadata_json": metadata.model_dump_json(),
+        **build_entity_template(metadata),
     }
@@ -2,10 +2,11 @@
 Data models for RAG functionality.
 """
 
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel
 
 
 class FileType(Enum):
@@ -29,27 +30,27 @@ class FileType(Enum):
             FileType if recognized, None otherwise
         """
         # - Remove leading dot and convert to lowercase
-        ext = ext.lstrip(".").lower()
+        return _EXT_MAP.get(ext.lstrip(".").lower())
 
-        # - Build mapping dict with additional extensions
-        ext_map = {ft.value: ft for ft in cls}
 
-        # - Add Cython (.pyx) as Python file type
-        ext_map['pyx'] = cls.PYTHON
+# - Extension -> FileType mapping, built once at import (Cython .pyx maps to Python)
+_EXT_MAP = {ft.value: ft for ft in FileType}
+_EXT_MAP["pyx"] = FileType.PYTHON
 
-        return ext_map.get(ext)
 
-
-class DocumentMetadata(BaseModel):
+@dataclass(slots=True)
+class DocumentMetadata:
     """
     Metadata extracted from knowledge files (markdown, Python, Jupyter notebooks).
-    """
 
-    model_config = ConfigDict(validate_default=False)
+    A plain slotted dataclass: one instance is built per indexed file and
+    per search result, all from trusted internal values, so pydantic's
+    construction-time validation and per-instance dict bought nothing.
+    """
 
     # - Common metadata (all file types)
     file_type: str | None = None  # "md", "py", "ipynb"
-    tags: list[str] | None = None
+    tags: list[str] = field(default_factory=list)
     created: str | None = None
     author: str | None = None
     type_field: str | None = None
@@ -74,14 +75,11 @@ class DocumentMetadata(BaseModel):
     markdown_cell_count: int | None = None  # Markdown cells
 
     # - Custom fields
-    custom: dict[str, Any] | None = None
-
-    def __init__(self, **data):
-        super().__init__(**data)
-        if self.tags is None:
-            object.__setattr__(self, 'tags', [])
-        if self.custom is None:
-            object.__setattr__(self, 'custom', {})
+    custom: dict[str, Any] = field(default_factory=dict)
+
+    def model_dump(self) -> dict[str, Any]:
+        """Plain-dict form (kept under the old pydantic name for callers)."""
+        return asdict(self)
 
 
 class DocumentEntity(BaseModel):
@@ -2,12 +2,20 @@
 Knowledge bases registry management.
 """
 
+import asyncio
 import json
 import os
 from pathlib import Path
 
 import yaml
 
+# - Prefer libyaml's C loader: an order of magnitude faster than the
+# - pure-Python SafeLoader, and the registry is parsed on every search
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 def get_knowledges_file() -> Path:
     """
@@ -19,6 +27,17 @@ def get_knowledges_file() -> Path:
     return Path.home() / ".aix" / "knowledges.yaml"
 
 
+# - Parsed-registry cache keyed on (mtime_ns, size): the file rarely changes
+# - but is re-read several times per search through the helper chain
+_cache: dict = {"stat": None, "data": {}}
+
+
+def invalidate_cache() -> None:
+    """Drop the cached registry (call after editing knowledges.yaml)."""
+    _cache["stat"] = None
+    _cache["data"] = {}
+
+
 def load_knowledges() -> dict:
     """
     Load knowledge bases from registry file.
@@ -27,17 +46,26 @@ def load_knowledges() -> dict:
     - path: ~/single/directory
     - paths: [~/dir1, ~/dir2]
 
+    The parsed result is cached and reused until the file's mtime or size
+    changes, skipping the YAML parse and per-path resolve() syscalls.
+
     Returns:
         Dict of knowledge bases with expanded paths
     """
     knowledges_file = get_knowledges_file()
 
-    if not knowledges_file.exists():
+    try:
+        stat = knowledges_file.stat()
+    except FileNotFoundError:
         return {}
 
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    if _cache["stat"] == cache_key:
+        return _cache["data"]
+
     try:
         with open(knowledges_file) as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=_YamlLoader)
 
         if not data or "knowledges" not in data:
             return {}
@@ -67,6 +95,8 @@ def load_knowledges() -> dict:
                     "tags": info.get("tags", [])
                 }
 
+        _cache["stat"] = cache_key
+        _cache["data"] = knowledges
         return knowledges
 
     except Exception:
@@ -96,30 +126,24 @@ async def list_knowledges() -> str:
     # - Check which ones exist and are indexed
     from xlmcp.tools.rag import storage
 
+    def _path_status(path: str) -> dict:
+        """Check existence/indexed status for one path (runs in a thread)."""
+        exists = Path(path).exists()
+        # - collection_exists short-circuits on the db file, so unindexed
+        # - paths don't open a Milvus client at all
+        indexed = storage.collection_exists(path) if exists else False
+        return {"path": path, "exists": exists, "indexed": indexed}
+
+    # - Each path maps to its own Milvus Lite client (a SQLite open), so
+    # - check all paths concurrently instead of serial round-trips
+    all_paths = [path for info in knowledges.values() for path in info["paths"]]
+    statuses = await asyncio.gather(*[asyncio.to_thread(_path_status, path) for path in all_paths])
+    status_by_path = {status["path"]: status for status in statuses}
+
     result = {}
     for name, info in knowledges.items():
-        paths = info["paths"]
-
-        # - Check status for each path
-        path_statuses = []
-        for path in paths:
-            exists = Path(path).exists()
-
-            # - Check if indexed
-            indexed = False
-            if exists:
-                collection_name = storage.get_collection_name(path)
-                client = storage.get_milvus_client(path)
-                indexed = client.has_collection(collection_name)
-
-            path_statuses.append({
-                "path": path,
-                "exists": exists,
-                "indexed": indexed
-            })
-
         result[name] = {
-            "paths": path_statuses,
+            "paths": [status_by_path[path] for path in info["paths"]],
             "description": info["description"],
             "tags": info["tags"]
         }
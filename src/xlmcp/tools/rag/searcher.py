@@ -3,19 +3,92 @@ Search functionality for markdown documents.
 Handles filter building, search execution, and tag/field extraction.
 """
 
-import json
+import asyncio
+import re
+from collections import Counter, OrderedDict
+from functools import lru_cache
 
-from xlmcp.config import get_config, validate_path
+import orjson
+
+from xlmcp.config import get_config, validate_path_str
 from xlmcp.tools.rag import indexer, storage
-from xlmcp.tools.rag.models import DocumentMetadata, SearchResultItem
+
+# - OPT_SERIALIZE_NUMPY: Milvus hands back numpy scalars for scores, so let
+# - orjson format them natively instead of requiring a float() per row
+_DUMPS_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _dumps(payload: dict) -> str:
+    """Serialize a response payload with orjson (2-space indent, in C)."""
+    return orjson.dumps(payload, option=_DUMPS_OPTS).decode()
+
+
+# - Comparison operators allowed in raw metadata filter expressions
+_OP_RE = re.compile(r" (?:>=|<=|!=|>|<) ")
+
+# - Bounded LRU of query embeddings keyed by the normalized query string.
+# - Interactive sessions repeat and iterate on queries, and a single short
+# - query still costs a full transformer forward pass (~5-30ms on CPU);
+# - a hit reduces search_documents to the ANN probe.
+_query_vec_cache: OrderedDict = OrderedDict()
+_MAX_QUERY_VECS = 1024
+
+# - Collections that were seen to exist: creation is rare compared to
+# - search, so a positive has_collection answer is cached for the process
+# - lifetime (negative answers are always re-checked)
+_known_collections: set[str] = set()
+
+
+def invalidate_collection(collection_name: str) -> None:
+    """Forget cached facts about a collection (call after dropping it)."""
+    _known_collections.discard(collection_name)
+    _tags_field_cache.pop(collection_name, None)
+
+
+def _has_collection(client, collection_name: str) -> bool:
+    """Cached has_collection check (positive results only)."""
+    if collection_name in _known_collections:
+        return True
+    if client.has_collection(collection_name):
+        _known_collections.add(collection_name)
+        return True
+    return False
+
+
+# - Per-collection cache: does the collection carry the native "tags" list
+# - field (newer indexes) or only the serialized tags_str (older indexes)?
+_tags_field_cache: dict[str, bool] = {}
+
+
+def _escape_filter_value(value: str) -> str:
+    """Escape backslashes and quotes for safe embedding in filter DSL."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("'", "\\'")
+
+
+def _collection_has_tags_field(client, collection_name: str) -> bool:
+    """Check (and cache) whether a collection stores the native tags list."""
+    cached = _tags_field_cache.get(collection_name)
+    if cached is not None:
+        return cached
+
+    try:
+        rows = client.query(collection_name=collection_name, filter="", output_fields=["tags"], limit=1)
+        has_field = bool(rows) and "tags" in rows[0]
+    except Exception:
+        has_field = False
+
+    _tags_field_cache[collection_name] = has_field
+    return has_field
 
 
-def build_tag_filter(tags: list[str]) -> str:
+def build_tag_filter(tags: list[str], use_array: bool = False) -> str:
     """
     Build Milvus filter expression for tags.
 
     Args:
         tags: List of tags (e.g., ["#backtest", "#qubx"])
+        use_array: Use json_contains on the native tags list (avoids the
+                   per-row substring scan of the LIKE fallback)
 
     Returns:
         Filter expression string (e.g., "tags_str like '%#backtest%' and tags_str like '%#qubx%'")
@@ -23,12 +96,40 @@ def build_tag_filter(tags: list[str]) -> str:
     if not tags:
         return ""
 
-    # - Build LIKE expressions for each tag (AND logic)
-    conditions = [f"tags_str like '%{tag}%'" for tag in tags]
+    if use_array:
+        # - Membership test on the tag list instead of a substring scan
+        conditions = [f'json_contains(tags, "{_escape_filter_value(tag)}")' for tag in tags]
+    else:
+        # - Build LIKE expressions for each tag (AND logic)
+        conditions = [f"tags_str like '%{_escape_filter_value(tag)}%'" for tag in tags]
 
     return " and ".join(conditions)
 
 
+# - Filterable entity fields, split by value type (mirrors the flattened
+# - fields build_entity_template writes); used by the specialized builder
+_STR_FILTER_FIELDS = frozenset({"type_field", "strategy"})
+_NUM_FILTER_FIELDS = frozenset({"sharpe", "cagr", "drawdown"})
+
+
+def _fast_metadata_filter(filters: dict) -> str | None:
+    """
+    Specialized builder for the common filter shapes (known fields with
+    plain equality values). Skips the operator scan and isinstance chain
+    of the generic path. Returns None when the shape isn't recognized.
+    """
+    parts = []
+    for key, value in filters.items():
+        field_name = "type_field" if key.lower() == "type" else key
+        if field_name in _STR_FILTER_FIELDS and isinstance(value, str):
+            parts.append(f'{field_name} == "{_escape_filter_value(value)}"')
+        elif field_name in _NUM_FILTER_FIELDS and isinstance(value, (int, float)) and not isinstance(value, bool):
+            parts.append(f"{field_name} == {value}")
+        else:
+            return None
+    return " and ".join(parts)
+
+
 def build_metadata_filter(filters: dict) -> str:
     """
     Build Milvus filter expression for metadata fields.
@@ -45,11 +146,16 @@ def build_metadata_filter(filters: dict) -> str:
     if not filters:
         return ""
 
+    # - Try the specialized known-schema builder first
+    fast = _fast_metadata_filter(filters)
+    if fast is not None:
+        return fast
+
     conditions = []
 
     for key, value in filters.items():
         # - Check if key contains operator (>, <, >=, <=, !=)
-        if any(op in key for op in [" > ", " < ", " >= ", " <= ", " != "]):
+        if _OP_RE.search(key):
             # - Direct expression like "sharpe > 1.5"
             conditions.append(key)
         else:
@@ -60,7 +166,7 @@ def build_metadata_filter(filters: dict) -> str:
             if value is None:
                 continue
             elif isinstance(value, str):
-                conditions.append(f'{field_name} == "{value}"')
+                conditions.append(f'{field_name} == "{_escape_filter_value(value)}"')
             elif isinstance(value, (int, float)):
                 conditions.append(f"{field_name} == {value}")
 
@@ -91,6 +197,19 @@ def combine_filters(tag_filter: str, metadata_filter: str) -> str:
     return " and ".join(filters)
 
 
+@lru_cache(maxsize=1024)
+def _build_filter(tags_key: tuple, meta_key: tuple, use_array: bool) -> str:
+    """
+    Build the combined filter expression, memoized on hashable keys.
+
+    Multi-turn RAG sessions tend to reuse the same filters, so the
+    string building is amortized across repeated queries.
+    """
+    tag_filter = build_tag_filter(list(tags_key), use_array=use_array)
+    meta_filter = build_metadata_filter(dict(meta_key))
+    return combine_filters(tag_filter, meta_filter)
+
+
 async def search_documents(
     directory: str,
     query: str,
@@ -115,8 +234,7 @@ async def search_documents(
     """
     try:
         # - Validate directory path
-        validated_dir = validate_path(directory)
-        directory = str(validated_dir)
+        directory = validate_path_str(directory)
 
         # - Auto-refresh if needed
         await indexer.auto_refresh_if_needed(directory)
@@ -125,37 +243,57 @@ async def search_documents(
         collection_name = storage.get_collection_name(directory)
         client = storage.get_milvus_client(directory)
 
-        if not client.has_collection(collection_name):
-            return json.dumps(
-                {"status": "error", "message": f"Directory not indexed: {directory}. Please index first."}, indent=2
-            )
+        if not _has_collection(client, collection_name):
+            return _dumps({"status": "error", "message": f"Directory not indexed: {directory}. Please index first."})
 
         # - Get embedding function
         embedding_fn = storage.get_embedding_function()
 
-        # - Encode query
-        query_vectors = embedding_fn.encode_queries([query])
+        # - Encode query off the event loop (CPU-heavy, releases the GIL
+        # - inside the model backend) so concurrent requests keep moving;
+        # - repeated queries hit the embedding LRU and skip the model
+        query_key = query.strip().lower()
+        query_vectors = _query_vec_cache.get(query_key)
+        if query_vectors is not None:
+            _query_vec_cache.move_to_end(query_key)
+        else:
+            query_vectors = await asyncio.to_thread(embedding_fn.encode_queries, [query])
+            if len(_query_vec_cache) >= _MAX_QUERY_VECS:
+                _query_vec_cache.popitem(last=False)
+            _query_vec_cache[query_key] = query_vectors
 
         # - Build filter expression
         tags = tags or []
         metadata_filters = metadata_filters or {}
 
-        tag_filter = build_tag_filter(tags)
-        meta_filter = build_metadata_filter(metadata_filters)
-        combined_filter = combine_filters(tag_filter, meta_filter)
-
-        # - Execute search
+        use_array = bool(tags) and _collection_has_tags_field(client, collection_name)
+        try:
+            combined_filter = _build_filter(tuple(tags), tuple(sorted(metadata_filters.items())), use_array)
+        except TypeError:
+            # - Unhashable filter values: build without memoization
+            tag_filter = build_tag_filter(tags, use_array=use_array)
+            meta_filter = build_metadata_filter(metadata_filters)
+            combined_filter = combine_filters(tag_filter, meta_filter)
+
+        # - Execute search. The threshold is pushed down as a range search so
+        # - rows the Python loop below would discard are pruned at the ANN
+        # - layer. Quick-setup collections use COSINE, where the reported
+        # - "distance" is the raw similarity and range search keeps
+        # - radius < value <= range_filter; the Python filter keeps
+        # - value <= 1 - threshold, so mirror exactly that window.
         search_params = {
             "collection_name": collection_name,
             "data": query_vectors,
             "limit": limit,
             "output_fields": ["text", "filename", "path", "metadata_json"],
+            "search_params": {"params": {"radius": -1.0, "range_filter": 1.0 - threshold}},
         }
 
         if combined_filter:
             search_params["filter"] = combined_filter
 
-        results = client.search(**search_params)
+        # - Blocking RPC: run in a worker thread so the loop isn't stalled
+        results = await asyncio.to_thread(client.search, **search_params)
 
         # - Parse results
         search_results = []
@@ -169,33 +307,34 @@ async def search_documents(
             if score < threshold:
                 continue
 
-            # - Parse metadata JSON
+            # - Parse metadata JSON straight to a dict: metadata_json was
+            # - produced from model_dump() at index time, so validating it
+            # - through Pydantic and dumping it again is a redundant round-trip
             metadata_json = res["entity"].get("metadata_json", "{}")
             try:
-                metadata = DocumentMetadata.model_validate_json(metadata_json)
-            except Exception:
-                metadata = DocumentMetadata()
-
-            # - Build result item
-            result_item = SearchResultItem(
-                text=res["entity"]["text"],
-                filename=res["entity"]["filename"],
-                path=res["entity"]["path"],
-                score=round(score, 4),
-                metadata=metadata,
+                metadata = orjson.loads(metadata_json)
+            except orjson.JSONDecodeError:
+                metadata = {}
+
+            entity = res["entity"]
+            search_results.append(
+                {
+                    "text": entity["text"],
+                    "filename": entity["filename"],
+                    "path": entity["path"],
+                    "score": round(score, 4),
+                    "metadata": metadata,
+                }
             )
 
-            search_results.append(result_item.model_dump())
-
-        return json.dumps(
-            {"status": "success", "query": query, "results_count": len(search_results), "results": search_results},
-            indent=2,
+        return _dumps(
+            {"status": "success", "query": query, "results_count": len(search_results), "results": search_results}
         )
 
     except PermissionError as e:
-        return json.dumps({"status": "error", "message": f"Permission denied: {e}"}, indent=2)
+        return _dumps({"status": "error", "message": f"Permission denied: {e}"})
     except Exception as e:
-        return json.dumps({"status": "error", "message": str(e)}, indent=2)
+        return _dumps({"status": "error", "message": str(e)})
 
 
 async def get_all_tags(directory: str) -> str:
@@ -210,39 +349,56 @@ async def get_all_tags(directory: str) -> str:
     """
     try:
         # - Validate directory path
-        validated_dir = validate_path(directory)
-        directory = str(validated_dir)
+        directory = validate_path_str(directory)
 
         # - Get client and collection
         collection_name = storage.get_collection_name(directory)
         client = storage.get_milvus_client(directory)
 
-        if not client.has_collection(collection_name):
-            return json.dumps({"status": "error", "message": f"Directory not indexed: {directory}"}, indent=2)
-
-        # - Query all tags_str fields
-        results = client.query(collection_name=collection_name, filter="", output_fields=["tags_str"], limit=10000)
+        if not _has_collection(client, collection_name):
+            return _dumps({"status": "error", "message": f"Directory not indexed: {directory}"})
+
+        # - Prefer the per-file tag index maintained at indexing time: a
+        # - small in-cache map instead of shipping every row's tags_str out
+        # - of Milvus. Only trusted when it covers every tracked file: an
+        # - incremental run on an index written before the tag index existed
+        # - leaves it holding just that run's files, and aggregating that
+        # - partial map would report a fraction of the real tags. Partial
+        # - (or absent) indexes fall through to the row scan below.
+        tracking_data = storage.load_tracking_file(directory)
+        tag_index = tracking_data.get("tag_index")
+        if tag_index and all(path in tag_index for path in tracking_data.get("files", ())):
+            tag_counts: Counter = Counter()
+            for entry in tag_index.values():
+                chunk_count = entry.get("chunks", 0)
+                for tag in entry.get("tags", ()):
+                    tag_counts[tag] += chunk_count
+            return _dumps({"status": "success", "tags": dict(tag_counts.most_common())})
+
+        # - Query all tags_str fields (blocking RPC, run off the loop)
+        results = await asyncio.to_thread(
+            client.query, collection_name=collection_name, filter="", output_fields=["tags_str"], limit=10000
+        )
 
-        # - Aggregate tags
-        tag_counts = {}
+        # - Aggregate tags (Counter.update does the per-tag counting in C
+        # - instead of a Python-level dict get/set per tag)
+        tag_counts: Counter = Counter()
         for res in results:
-            tags_str = res.get("tags_str", "[]")
             try:
-                tags = json.loads(tags_str)
-                for tag in tags:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-            except json.JSONDecodeError:
+                # - Hot loop over up to 10k rows: orjson decode is much cheaper
+                tag_counts.update(orjson.loads(res.get("tags_str", "[]")))
+            except orjson.JSONDecodeError:
                 pass
 
         # - Sort by count descending
-        sorted_tags = dict(sorted(tag_counts.items(), key=lambda x: x[1], reverse=True))
+        sorted_tags = dict(tag_counts.most_common())
 
-        return json.dumps({"status": "success", "tags": sorted_tags}, indent=2)
+        return _dumps({"status": "success", "tags": sorted_tags})
 
     except PermissionError as e:
-        return json.dumps({"status": "error", "message": f"Permission denied: {e}"}, indent=2)
+        return _dumps({"status": "error", "message": f"Permission denied: {e}"})
     except Exception as e:
-        return json.dumps({"status": "error", "message": str(e)}, indent=2)
+        return _dumps({"status": "error", "message": str(e)})
 
 
 async def get_metadata_fields(directory: str) -> str:
@@ -257,18 +413,18 @@ async def get_metadata_fields(directory: str) -> str:
     """
     try:
         # - Validate directory path
-        validated_dir = validate_path(directory)
-        directory = str(validated_dir)
+        directory = validate_path_str(directory)
 
         # - Get client and collection
         collection_name = storage.get_collection_name(directory)
         client = storage.get_milvus_client(directory)
 
-        if not client.has_collection(collection_name):
-            return json.dumps({"status": "error", "message": f"Directory not indexed: {directory}"}, indent=2)
+        if not _has_collection(client, collection_name):
+            return _dumps({"status": "error", "message": f"Directory not indexed: {directory}"})
 
-        # - Query sample documents
-        results = client.query(
+        # - Query sample documents (blocking RPC, run off the loop)
+        results = await asyncio.to_thread(
+            client.query,
             collection_name=collection_name,
             filter="",
             output_fields=["type_field", "strategy", "sharpe", "cagr", "drawdown", "metadata_json"],
@@ -295,9 +451,9 @@ async def get_metadata_fields(directory: str) -> str:
             examples = list(fields_info[field_name]["examples"])[:5]
             fields_info[field_name]["examples"] = examples
 
-        return json.dumps({"status": "success", "fields": fields_info}, indent=2)
+        return _dumps({"status": "success", "fields": fields_info})
 
     except PermissionError as e:
-        return json.dumps({"status": "error", "message": f"Permission denied: {e}"}, indent=2)
+        return _dumps({"status": "error", "message": f"Permission denied: {e}"})
     except Exception as e:
-        return json.dumps({"status": "error", "message": str(e)}, indent=2)
+        return _dumps({"status": "error", "message": str(e)})
@@ -3,19 +3,45 @@ Storage layer for RAG functionality.
 Handles Milvus clients, collections, and tracking files.
 """
 
+from __future__ import annotations
+
+import asyncio
 import json
+import os
 import re
+import shutil
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+import orjson
 
-from pymilvus import MilvusClient  # noqa: E402
+from xlmcp.config import get_config
 
-from xlmcp.config import get_config  # noqa: E402
+# - pymilvus drags in grpc/protobuf/numpy; import it lazily inside
+# - get_milvus_client so CLI paths that never touch RAG stay fast
+if TYPE_CHECKING:
+    from pymilvus import MilvusClient
 
-# - Global clients cache: {sanitized_dir_name: MilvusClient}
-_clients: dict[str, MilvusClient] = {}
+# - Bounded LRU of Milvus clients: {sanitized_dir_name: MilvusClient}.
+# - Each client holds file handles (Milvus Lite SQLite state), so evict the
+# - least recently used one instead of growing without bound.
+_clients: OrderedDict[str, MilvusClient] = OrderedDict()
+_MAX_CLIENTS = 16
+# - Guards lookup, eviction, and creation: list_knowledges fans out over
+# - asyncio.to_thread workers, and an unlocked check-then-insert can open
+# - two clients for the same SQLite file (leaking one) or corrupt the LRU
+_clients_lock = threading.Lock()
 
-# - Embedding function (singleton)
+# - Embedding function (singleton). The lock keeps concurrent tool calls
+# - from racing the first initialization and loading the model twice.
 _embedding_fn = None
+_embedding_lock = threading.Lock()
+
+# - Precompiled sanitizer pattern (the function runs on every storage call)
+_SANITIZE_RE = re.compile(r"[^a-zA-Z0-9]+")
 
 
 def get_embedding_function():
@@ -24,16 +50,23 @@ def get_embedding_function():
     """
     global _embedding_fn
     if _embedding_fn is None:
-        from pymilvus import model
+        with _embedding_lock:
+            # - Re-check under the lock: another thread may have just loaded it
+            if _embedding_fn is None:
+                from pymilvus import model
 
-        _embedding_fn = model.DefaultEmbeddingFunction()
+                _embedding_fn = model.DefaultEmbeddingFunction()
     return _embedding_fn
 
 
+@lru_cache(maxsize=256)
 def sanitize_directory_name(dir_path: str) -> str:
     """
     Convert directory path to sanitized cache name.
 
+    Memoized on the raw input string: callers hit this with the same
+    directory repeatedly and the resolve() inside is syscall-heavy.
+
     Examples:
         /home/quant0/projects/xfiles → projects-xfiles
         /home/user/docs/research → docs-research
@@ -52,7 +85,7 @@ def sanitize_directory_name(dir_path: str) -> str:
     name = "-".join(name_parts)
 
     # - Replace non-alphanumeric with hyphen
-    name = re.sub(r"[^a-zA-Z0-9]+", "-", name)
+    name = _SANITIZE_RE.sub("-", name)
 
     # - Remove leading/trailing hyphens
     name = name.strip("-")
@@ -60,6 +93,7 @@ def sanitize_directory_name(dir_path: str) -> str:
     return name.lower()
 
 
+@lru_cache(maxsize=256)
 def get_collection_name(directory: str) -> str:
     """
     Get collection name for directory.
@@ -71,6 +105,10 @@ def get_collection_name(directory: str) -> str:
     return f"knowledge_{sanitized}"
 
 
+# - Cache directories already created this process (mkdir issued once each)
+_created_cache_dirs: set[Path] = set()
+
+
 def get_cache_directory(directory: str) -> Path:
     """
     Get cache directory path for a knowledge directory.
@@ -78,7 +116,10 @@ def get_cache_directory(directory: str) -> Path:
     config = get_config()
     sanitized = sanitize_directory_name(directory)
     cache_path = config.rag.cache_dir / sanitized
-    cache_path.mkdir(parents=True, exist_ok=True, mode=0o700)
+    # - Issue the mkdir syscalls only the first time we see this path
+    if cache_path not in _created_cache_dirs:
+        cache_path.mkdir(parents=True, exist_ok=True, mode=0o700)
+        _created_cache_dirs.add(cache_path)
     return cache_path
 
 
@@ -88,12 +129,49 @@ def get_milvus_client(directory: str) -> MilvusClient:
     """
     sanitized = sanitize_directory_name(directory)
 
-    if sanitized not in _clients:
+    with _clients_lock:
+        client = _clients.get(sanitized)
+        if client is not None:
+            # - Refresh LRU position on hit
+            _clients.move_to_end(sanitized)
+            return client
+
+        # - Evict the least recently used client before inserting a new one
+        if len(_clients) >= _MAX_CLIENTS:
+            _, old_client = _clients.popitem(last=False)
+            # - Drop ensured-collection entries tied to the evicted client so a
+            # - recycled object id can never hit a stale gate
+            _ensured_collections.difference_update(
+                {key for key in _ensured_collections if key[0] == id(old_client)}
+            )
+            try:
+                old_client.close()
+            except Exception:
+                pass
+
+        from pymilvus import MilvusClient
+
         cache_dir = get_cache_directory(directory)
         db_path = cache_dir / "milvus.db"
-        _clients[sanitized] = MilvusClient(str(db_path))
+        client = MilvusClient(str(db_path))
+        _clients[sanitized] = client
+        return client
+
+
+def collection_exists(directory: str) -> bool:
+    """
+    Check whether a directory has an indexed collection.
+
+    Cheap pre-check on the Milvus Lite db file avoids opening (and
+    creating) a client for directories that were never indexed.
+    """
+    config = get_config()
+    db_path = config.rag.cache_dir / sanitize_directory_name(directory) / "milvus.db"
+    if not db_path.exists():
+        return False
 
-    return _clients[sanitized]
+    client = get_milvus_client(directory)
+    return client.has_collection(get_collection_name(directory))
 
 
 def cleanup_clients():
@@ -102,35 +180,61 @@ def cleanup_clients():
 
     Call this at the end of CLI commands to avoid cleanup delays.
     """
-    global _clients, _embedding_fn
+    global _embedding_fn
+
+    # - Fast no-op for commands that never touched RAG
+    if not _clients and _embedding_fn is None:
+        return
 
     # - Close all Milvus clients
-    for client in _clients.values():
-        try:
-            client.close()
-        except Exception:
-            pass
-    _clients.clear()
-
-    # - Cleanup embedding function
-    if _embedding_fn is not None:
-        try:
-            # - Force cleanup of embedding model
-            del _embedding_fn
-        except Exception:
-            pass
-        _embedding_fn = None
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _clients.clear()
+        _ensured_collections.clear()
+
+    # - Drop the embedding model reference; GC collects it
+    _embedding_fn = None
+
+
+# - Collections already verified this process, keyed by (client id, name):
+# - skips the has_collection metadata round-trip on repeat index calls
+_ensured_collections: set[tuple[int, str]] = set()
+
+
+def forget_collection(client: MilvusClient, collection_name: str):
+    """
+    Invalidate in-process caches after a collection is dropped.
+
+    Every drop_collection call must be paired with this, or the ensured
+    gate makes the next ensure_collection a no-op and inserts fail
+    against the missing collection.
+    """
+    _ensured_collections.discard((id(client), collection_name))
+
+    # - Drop the searcher's positive caches too, so the next search
+    # - reports "not indexed" instead of hitting a missing collection
+    # - (local import: searcher imports this module)
+    from xlmcp.tools.rag import searcher
+
+    searcher.invalidate_collection(collection_name)
 
 
 def ensure_collection(client: MilvusClient, collection_name: str):
     """
     Ensure collection exists with correct schema.
     """
-    if client.has_collection(collection_name):
+    key = (id(client), collection_name)
+    if key in _ensured_collections:
         return
 
-    # - Create collection with 768-dim vectors (PyMilvus DefaultEmbeddingFunction)
-    client.create_collection(collection_name, dimension=768, auto_id=True)
+    if not client.has_collection(collection_name):
+        # - Create collection with 768-dim vectors (PyMilvus DefaultEmbeddingFunction)
+        client.create_collection(collection_name, dimension=768, auto_id=True)
+    _ensured_collections.add(key)
 
 
 def get_tracking_file_path(directory: str) -> Path:
@@ -141,6 +245,12 @@ def get_tracking_file_path(directory: str) -> Path:
     return cache_dir / "tracking.json"
 
 
+# - In-process tracking-data cache: {tracking_path: (mtime_ns, data)}.
+# - auto-refresh checks reload this JSON on every tool call; the mtime key
+# - means the parse is repeated only when another process rewrote the file.
+_tracking_cache: dict[str, tuple[int, dict]] = {}
+
+
 def load_tracking_file(directory: str) -> dict:
     """
     Load tracking data for directory.
@@ -149,25 +259,33 @@ def load_tracking_file(directory: str) -> dict:
         {
             "last_checked": timestamp,
             "files": {
-                "/absolute/path/file.md": ["md5_hash", mtime]
+                "/absolute/path/file.md": ["content_hash", mtime]
             }
         }
     """
     tracking_path = get_tracking_file_path(directory)
 
-    if not tracking_path.exists():
+    try:
+        mtime_ns = tracking_path.stat().st_mtime_ns
+    except FileNotFoundError:
         return {"last_checked": 0, "files": {}}
 
+    cached = _tracking_cache.get(str(tracking_path))
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
     try:
-        with open(tracking_path) as f:
-            data = json.load(f)
-            # - Ensure structure
-            if "last_checked" not in data:
-                data["last_checked"] = 0
-            if "files" not in data:
-                data["files"] = {}
-            return data
-    except (json.JSONDecodeError, PermissionError):
+        # - Single slurp + orjson decode: much faster than json.load through
+        # - a buffered text wrapper for tracking files with many entries
+        data = orjson.loads(tracking_path.read_bytes())
+        # - Ensure structure
+        if "last_checked" not in data:
+            data["last_checked"] = 0
+        if "files" not in data:
+            data["files"] = {}
+        _tracking_cache[str(tracking_path)] = (mtime_ns, data)
+        return data
+    except (orjson.JSONDecodeError, PermissionError, OSError):
         return {"last_checked": 0, "files": {}}
 
 
@@ -177,8 +295,57 @@ def save_tracking_file(directory: str, data: dict):
     """
     tracking_path = get_tracking_file_path(directory)
 
-    with open(tracking_path, "w") as f:
-        json.dump(data, f, indent=2)
+    # - Compact output: tracking files are machine-read only, so indenting
+    # - would just double the bytes written. OPT_NON_STR_KEYS: the cached
+    # - frontmatter in meta_cache can carry YAML mappings with int/date keys
+    # - (e.g. "years: {2023: ok}"), which orjson otherwise rejects
+    tracking_path.write_bytes(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+
+    # - Keep the cache current so the next load skips the re-parse
+    try:
+        _tracking_cache[str(tracking_path)] = (tracking_path.stat().st_mtime_ns, data)
+    except FileNotFoundError:
+        _tracking_cache.pop(str(tracking_path), None)
+
+
+def _read_index_entry(subdir_path: str, cache_name: str) -> dict | None:
+    """Read one cache subdirectory's tracking file into an index entry."""
+    tracking_path = os.path.join(subdir_path, "tracking.json")
+
+    try:
+        # - Open directly and let FileNotFoundError signal absence: saves
+        # - the extra exists() stat per subdirectory
+        with open(tracking_path, "rb") as f:
+            tracking = orjson.loads(f.read())
+
+        files = tracking.get("files", {})
+        file_count = len(files)
+        last_checked = tracking.get("last_checked", 0)
+
+        # - Extract original directory from file paths: one C-level
+        # - commonpath pass over a sample instead of zipping parts per file
+        original_dir = None
+        if files:
+            sample = list(files.keys())[:10]  # Check first 10 files
+            try:
+                original_dir = os.path.commonpath(sample)
+                # - A lone (or repeated) file path is its own commonpath;
+                # - step up to the containing directory
+                if original_dir in files:
+                    original_dir = os.path.dirname(original_dir)
+            except ValueError:
+                # - Mixed absolute/relative paths
+                original_dir = str(Path(sample[0]).parent)
+
+        return {
+            "cache_name": cache_name,
+            "directory": original_dir,
+            "file_count": file_count,
+            "last_checked": last_checked,
+            "cache_path": subdir_path,
+        }
+    except (orjson.JSONDecodeError, FileNotFoundError, PermissionError, OSError):
+        return None
 
 
 async def list_all_indexes() -> str:
@@ -192,60 +359,20 @@ async def list_all_indexes() -> str:
     cache_dir = config.rag.cache_dir
 
     if not cache_dir.exists():
-        return json.dumps({"indexes": []}, indent=2)
-
-    indexes = []
-
-    for subdir in cache_dir.iterdir():
-        if not subdir.is_dir():
-            continue
-
-        # - Load tracking file
-        tracking_path = subdir / "tracking.json"
-        if not tracking_path.exists():
-            continue
-
-        try:
-            with open(tracking_path) as f:
-                tracking = json.load(f)
-
-            files = tracking.get("files", {})
-            file_count = len(files)
-            last_checked = tracking.get("last_checked", 0)
-
-            # - Extract original directory from file paths
-            original_dir = None
-            if files:
-                # - Get first file path and extract common parent
-                first_file = next(iter(files.keys()))
-                file_path = Path(first_file)
-                # - Find the common parent directory
-                # - Assume all files share a common root directory
-                original_dir = str(file_path.parent)
-                # - Try to find the shortest common path
-                for file in list(files.keys())[:10]:  # Check first 10 files
-                    fp = Path(file)
-                    # - Find common parts
-                    try:
-                        common = Path(*[p for p, q in zip(file_path.parts, fp.parts) if p == q])
-                        if len(common.parts) < len(Path(original_dir).parts):
-                            original_dir = str(common)
-                    except ValueError:
-                        pass
-
-            indexes.append(
-                {
-                    "cache_name": subdir.name,
-                    "directory": original_dir,
-                    "file_count": file_count,
-                    "last_checked": last_checked,
-                    "cache_path": str(subdir),
-                }
-            )
-        except (json.JSONDecodeError, PermissionError):
-            continue
+        return orjson.dumps({"indexes": []}, option=orjson.OPT_INDENT_2).decode()
+
+    # - os.scandir reuses the dirent type from the directory listing, so
+    # - is_dir() needs no extra stat and no Path object per entry
+    with os.scandir(cache_dir) as it:
+        subdirs = [(entry.path, entry.name) for entry in it if entry.is_dir(follow_symlinks=False)]
 
-    return json.dumps({"indexes": indexes}, indent=2)
+    # - Read tracking files concurrently off the event loop: the per-subdir
+    # - reads are independent blocking I/O, so overlap them instead of
+    # - serializing (and stalling the loop) on each one
+    entries = await asyncio.gather(*(asyncio.to_thread(_read_index_entry, path, name) for path, name in subdirs))
+    indexes = [entry for entry in entries if entry is not None]
+
+    return orjson.dumps({"indexes": indexes}, option=orjson.OPT_INDENT_2).decode()
 
 
 async def drop_index(directory: str) -> str:
@@ -262,20 +389,21 @@ async def drop_index(directory: str) -> str:
         collection_name = get_collection_name(directory)
         client = get_milvus_client(directory)
 
-        # - Drop collection if exists
+        # - Drop collection if exists (and forget the ensured gate so a
+        # - later reindex recreates it)
         if client.has_collection(collection_name):
             client.drop_collection(collection_name)
+        forget_collection(client, collection_name)
 
         # - Remove from clients cache
         sanitized = sanitize_directory_name(directory)
-        if sanitized in _clients:
-            del _clients[sanitized]
+        with _clients_lock:
+            _clients.pop(sanitized, None)
 
-        # - Remove cache directory
+        # - Remove cache directory (and forget it so a later call recreates it)
         cache_dir = get_cache_directory(directory)
+        _created_cache_dirs.discard(cache_dir)
         if cache_dir.exists():
-            import shutil
-
             shutil.rmtree(cache_dir)
 
         return json.dumps({"status": "success", "message": f"Dropped index for {directory}"}, indent=2)
@@ -26,6 +26,11 @@ red, green, yellow, blue, magenta, cyan, white = (
 )
 
 
+# - Memoized tool listing: the registered tool set is fixed for the
+# - lifetime of a CLI process, so introspect the server only once
+_tools_cache: list[dict] | None = None
+
+
 def list_server_tools() -> list[dict]:
     """
     List all MCP tools registered in the server.
@@ -33,6 +38,10 @@ def list_server_tools() -> list[dict]:
     Returns:
         List of dicts with tool name and description
     """
+    global _tools_cache
+    if _tools_cache is not None:
+        return _tools_cache
+
     from xlmcp.server import mcp
 
     tools = []
@@ -43,18 +52,22 @@ def list_server_tools() -> list[dict]:
         for name, tool in sorted(tool_dict.items()):
             desc = ""
             if hasattr(tool, 'description'):
-                desc = tool.description.split('\n')[0][:60]
+                # - partition allocates one 3-tuple instead of a list of
+                # - every line in the docstring
+                desc = tool.description.partition('\n')[0][:60]
             tools.append({
                 "name": name,
                 "description": desc
             })
     else:
-        # - Alternative: scan server module for decorated functions
+        # - Alternative: scan server module for decorated functions.
+        # - vars() iterates the module dict directly, skipping the sort and
+        # - per-attribute getattr that inspect.getmembers performs
         from xlmcp import server
 
-        for name, obj in inspect.getmembers(server):
+        for name, obj in vars(server).items():
             if inspect.iscoroutinefunction(obj) and not name.startswith('_'):
-                if obj.__doc__ and (name.startswith('jupyter_') or name.startswith('markdown_')):
+                if obj.__doc__ and name.startswith(('jupyter_', 'markdown_')):
                     doc_lines = obj.__doc__.strip().split('\n')
                     desc = doc_lines[0].strip() if doc_lines else ""
                     tools.append({
@@ -62,6 +75,7 @@ def list_server_tools() -> list[dict]:
                         "description": desc
                     })
 
+    _tools_cache = tools
     return tools
 
 
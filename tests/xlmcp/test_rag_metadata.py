@@ -128,23 +128,17 @@ def test_extract_metadata():
 
 def test_extract_metadata_with_missing_frontmatter():
     """Test metadata extraction with missing frontmatter."""
-    # - Create temp file without frontmatter
-    temp_file = TEST_DATA_DIR / "temp_no_frontmatter.md"
-    temp_file.write_text("# Test\n\nContent with #test-tag")
+    # - Bytes variant: no temp file in the test data directory needed
+    data = b"# Test\n\nContent with #test-tag"
 
-    try:
-        doc_metadata = metadata.extract_metadata(str(temp_file))
+    doc_metadata = metadata.extract_metadata_bytes(data, "temp_no_frontmatter.md")
 
-        # - Verify inline tags still extracted
-        assert "#test-tag" in doc_metadata.tags
+    # - Verify inline tags still extracted
+    assert "#test-tag" in doc_metadata.tags
 
-        # - Verify other fields are None/empty
-        assert doc_metadata.type_field is None
-        assert doc_metadata.sharpe is None
-
-    finally:
-        if temp_file.exists():
-            temp_file.unlink()
+    # - Verify other fields are None/empty
+    assert doc_metadata.type_field is None
+    assert doc_metadata.sharpe is None
 
 
 def test_build_entity_dict():
@@ -9,11 +9,19 @@ from pathlib import Path
 
 import pytest
 
-from xlmcp.tools.rag import indexer, searcher
+from xlmcp.tools.rag import indexer, searcher, storage
 
 # - Test data directory
 TEST_DATA_DIR = str(Path(__file__).parent.parent / "data" / "knowledge1")
-TEST_CACHE_DIR = "/tmp/test_xmcp_rag_cache"
+# - Per-process cache dir so parallel test workers don't collide
+TEST_CACHE_DIR = f"/tmp/test_xmcp_rag_cache_{os.getpid()}"
+
+
+@pytest.fixture(scope="session")
+def embedding_model():
+    """Load the embedding model once for the whole session (it is a
+    process-wide singleton; reloading it per test costs seconds each)."""
+    return storage.get_embedding_function()
 
 
 @pytest.fixture(autouse=True)
@@ -35,7 +43,7 @@ def setup_environment():
 
 
 @pytest.fixture
-async def indexed_directory():
+async def indexed_directory(embedding_model):
     """Fixture to ensure directory is indexed before tests."""
     await indexer.index_directory(TEST_DATA_DIR, recursive=True, force_reindex=True)
     return TEST_DATA_DIR
@@ -53,8 +61,10 @@ async def test_search_basic(indexed_directory):
     assert data["status"] == "success"
     assert data["query"] == "stochastic calculus"
 
-    # - Verify results returned
-    assert data["results_count"] >= 0
+    # - Verify results returned: the test corpus contains a stochastic
+    # - calculus document, so a zero-threshold search must match something
+    # - (guards against the range-search pushdown filtering everything out)
+    assert data["results_count"] > 0
     assert "results" in data
 
 